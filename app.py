@@ -1,10 +1,22 @@
 import flet as ft
 import time
 from datetime import date, timedelta
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import sync_playwright, expect, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 import threading
+import queue
 import os
+import json
+import uuid
+import secrets
+import hmac
+import math
+import argparse
 import re
+import bisect
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from typing import NamedTuple
 
 # 認証情報ファイルのパス (このままでOK)
 AUTH_FILE_PATH = 'playwright_auth.json'
@@ -23,6 +35,35 @@ BASE_URL = "https://www.street-academy.com"
 ORGANIZER_SCHEDULE_URL = f"{BASE_URL}/dashboard/organizers/schedule_list"
 TEACHER_SCHEDULE_URL = f"{BASE_URL}/dashboard/steachers/manage_class_dates"
 
+# 日程一覧の並列スキャン設定
+SCAN_WORKERS = 4  # 同時にスキャンするワーカー数
+SCAN_MIN_INTERVAL = 0.5  # 全ワーカー共通のリクエスト間隔(秒)
+
+# 長時間実行時のブラウザ再生成設定（メモリ肥大化対策）
+RECYCLE_EVERY_N_NAVIGATIONS = 50  # この回数ページ遷移したらページとコンテキストを作り直す
+RECYCLE_MEMORY_THRESHOLD_MB = 500  # JSヒープ使用量がこの値(MB)を超えたら作り直す
+MEMORY_CHECK_INTERVAL = 10  # メモリ使用量を確認するページ遷移の間隔
+
+# 一時的なエラーで失敗した日程のリトライ設定
+RETRY_MAX_ATTEMPTS = 3  # 最初の1回を含む最大試行回数
+RETRY_BACKOFF_SECONDS = 30  # リトライ前の待機秒数（リトライごとに倍増）
+
+# 複数の日程をまとめて送信する設定
+BATCH_SIZE = 20  # 1回のフォーム送信にまとめる日程数の上限
+PIPELINE_MODE = True  # 確定後の完了待ちの間に、もう1枚のページで次のフォームを先に読み込む（False で1件ずつ順に処理）
+
+# 追加前の重複・時間帯の重なりチェック
+CONFLICT_POLICY = "skip"  # "skip": 重なる日程を除外して続行, "warn": 警告を表示してそのまま追加
+
+# サービスモード（ローカルHTTP API）設定
+SERVICE_HOST = "127.0.0.1"  # 外部に公開しないためローカルホストのみで待ち受ける
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 2  # 常駐させるブラウザの数（同時に実行できるジョブ数）
+SERVICE_HEADLESS = True
+SERVICE_TOKEN_HEADER = "X-Service-Token"  # 起動時に発行するトークンを送るヘッダー
+SERVICE_MAX_FINISHED_JOBS = 100  # 保持する終了済みジョブの数（古いものから削除）
+SERVICE_MAX_LOG_LINES = 5000  # ジョブごとに保持するログの行数（古いものから削除）
+
 class PlaywrightHelper:
     """Playwrightの共通処理を提供するヘルパークラス"""
     
@@ -38,13 +79,17 @@ class PlaywrightHelper:
         return playwright, browser, context
     
     @staticmethod
-    def handle_403_forbidden(page, log_func, max_retries=3):
-        """403 Forbiddenエラーの処理"""
+    def handle_403_forbidden(page, log_func, max_retries=3, control=None):
+        """403 Forbiddenエラーの処理（control があれば待機中の停止・一時停止に応じる）"""
         for retry in range(max_retries):
             body_html = page.content()
             if "403 Forbidden" in body_html:
                 log_func("403 Forbidden画面を検知。2分間待機してリトライします。")
-                time.sleep(120)
+                if control:
+                    control.sleep(120)
+                    control.checkpoint(log_func)
+                else:
+                    time.sleep(120)
             else:
                 return True
         log_func("403 Forbiddenが解消しませんでした。")
@@ -62,12 +107,500 @@ class PlaywrightHelper:
             time.sleep(2)
         return False
 
+class BrowserPool:
+    """サービスモードでワーカースレッドごとに起動したままにするブラウザを管理する"""
+
+    _local = threading.local()
+
+    @staticmethod
+    def register(playwright, browser, worker_name):
+        """現在のスレッドの常駐ブラウザとして、ワーカー名とともに登録する"""
+        BrowserPool._local.pooled = (playwright, browser)
+        BrowserPool._local.worker_name = worker_name
+
+    @staticmethod
+    def current():
+        """現在のスレッドの常駐ブラウザ (playwright, browser) を返す（なければ None）"""
+        pooled = getattr(BrowserPool._local, 'pooled', None)
+        if pooled and pooled[1].is_connected():
+            return pooled
+        return None
+
+    @staticmethod
+    def worker_name():
+        """現在のスレッドのワーカー名を返す（サービスモード以外では "worker-1"）"""
+        return getattr(BrowserPool._local, 'worker_name', "worker-1")
+
+class BrowserSession:
+    """ブラウザ・コンテキスト・ページをまとめて保持し、ポリシーに従ってページとコンテキストを作り直す"""
+
+    def __init__(self, log_func, worker_name=None, control=None,
+                 recycle_every=RECYCLE_EVERY_N_NAVIGATIONS,
+                 memory_threshold_mb=RECYCLE_MEMORY_THRESHOLD_MB,
+                 memory_check_interval=MEMORY_CHECK_INTERVAL):
+        self.log_func = log_func
+        self.worker_name = worker_name or BrowserPool.worker_name()
+        self.control = control or JobControl()  # 待機中に停止・一時停止を受け付けるためのジョブの制御
+        self.recycle_every = recycle_every
+        self.memory_threshold_mb = memory_threshold_mb
+        self.memory_check_interval = memory_check_interval
+        pooled = BrowserPool.current()
+        if pooled:
+            # 常駐ブラウザがあれば起動を省き、コンテキストだけを新しく作る
+            if not os.path.exists(AUTH_FILE_PATH):
+                raise Exception("認証ファイル 'playwright_auth.json' が見つかりません。")
+            self.playwright, self.browser = pooled
+            self.context = self.browser.new_context(storage_state=AUTH_FILE_PATH)
+            self.owns_browser = False
+        else:
+            self.playwright, self.browser, self.context = PlaywrightHelper.create_browser_context()
+            self.owns_browser = True
+        self.navigation_count = 0  # 現在のコンテキストでの遷移回数
+        self.total_navigation_count = 0
+        self.recycle_count = 0
+        self._memory_checked_at = 0  # 最後にメモリ使用量を確認したときの遷移回数
+        self._recycle_pending = False  # メモリ使用量の超過を検知し、作り直しを待っている
+        self.page = self._new_page()
+        self.spare_page = None  # 先読み用の2枚目のページ（必要になったときに作る）
+        self._cdp_session = None
+
+    def _new_page(self):
+        """ページを作り、遷移回数を数えるハンドラを登録する"""
+        page = self.context.new_page()
+        # session.goto 以外（ページ内の goto やリンクのクリック）による遷移も数える
+        page.on("framenavigated", self._on_frame_navigated)
+        return page
+
+    def _on_frame_navigated(self, frame):
+        if frame.parent_frame is None:
+            self.navigation_count += 1
+            self.total_navigation_count += 1
+
+    def goto(self, url, page=None, **kwargs):
+        """
+        必要ならページを作り直してから遷移する。
+        page を指定した場合（先読み用のページなど）は、他のページが処理中の可能性があるため作り直さない。
+        """
+        if page is None:
+            if self.should_recycle():
+                self.recycle()
+            page = self.page
+        return page.goto(url, **kwargs)
+
+    def get_spare_page(self):
+        """先読み用の2枚目のページを返す（なければ同じコンテキストに作る）"""
+        if self.spare_page is None:
+            self.spare_page = self._new_page()
+        return self.spare_page
+
+    def swap_pages(self):
+        """先読み用のページを現在のページにし、それまでのページを次の先読みに使う"""
+        self.page, self.spare_page = self.get_spare_page(), self.page
+        self._detach_cdp_session()
+
+    def _detach_cdp_session(self):
+        """メモリ確認用のCDPセッションを切り離す（次の確認で現在のページに付け直す）"""
+        if self._cdp_session is not None:
+            try:
+                self._cdp_session.detach()
+            except Exception:
+                pass
+            self._cdp_session = None
+
+    def get_memory_mb(self):
+        """現在のページのJSヒープ使用量(MB)を取得（取得できない場合は None）"""
+        try:
+            if self._cdp_session is None:
+                self._cdp_session = self.context.new_cdp_session(self.page)
+                self._cdp_session.send("Performance.enable")
+            metrics = self._cdp_session.send("Performance.getMetrics")["metrics"]
+            for metric in metrics:
+                if metric["name"] == "JSHeapUsedSize":
+                    return metric["value"] / (1024 * 1024)
+        except Exception:
+            pass
+        return None
+
+    def should_recycle(self):
+        """
+        遷移回数・メモリ使用量のどちらかが閾値を超えていれば True。
+        メモリ使用量の超過は作り直すまで記録しておくため、先読みの判定で確認した結果も次の goto で使われる。
+        """
+        if self.recycle_every and self.navigation_count >= self.recycle_every:
+            return True
+        if (not self._recycle_pending and self.memory_threshold_mb
+                and self.navigation_count - self._memory_checked_at >= self.memory_check_interval):
+            self._memory_checked_at = self.navigation_count
+            memory_mb = self.get_memory_mb()
+            if memory_mb is not None and memory_mb > self.memory_threshold_mb:
+                self._recycle_pending = True
+        return self._recycle_pending
+
+    def recycle(self):
+        """ログイン状態を引き継いだまま、ページとコンテキストを作り直す"""
+        memory_mb = self.get_memory_mb()
+        storage_state = self.context.storage_state()
+        self.context.close()
+        self.context = self.browser.new_context(storage_state=storage_state)
+        self.page = self._new_page()
+        self.spare_page = None
+        self._cdp_session = None
+        self.recycle_count += 1
+        memory_text = f"{memory_mb:.1f} MB" if memory_mb is not None else "取得不可"
+        self.log_func(f"[{self.worker_name}] {self.navigation_count} 回遷移したページを再生成しました（再生成前のJSヒープ: {memory_text}）")
+        self.navigation_count = 0
+        self._memory_checked_at = 0
+        self._recycle_pending = False
+
+    def report_memory(self):
+        """ワーカーごとのメモリ使用量と遷移回数をログに出力"""
+        memory_mb = self.get_memory_mb()
+        memory_text = f"{memory_mb:.1f} MB" if memory_mb is not None else "取得不可"
+        self.log_func(f"[{self.worker_name}] 遷移回数: {self.total_navigation_count} / 再生成回数: {self.recycle_count} / JSヒープ: {memory_text}")
+
+    def close(self):
+        """ブラウザを閉じて Playwright を停止（常駐ブラウザの場合はコンテキストのみ閉じる）"""
+        if not self.owns_browser:
+            self.report_memory()
+            self.context.close()
+            return
+        try:
+            self.report_memory()
+            self.browser.close()
+        finally:
+            self.playwright.stop()
+
+class JobCancelled(Exception):
+    """停止ボタンによりジョブが中断されたことを表す"""
+
+class JobControl:
+    """実行中のジョブに停止・一時停止を伝えるための制御オブジェクト"""
+
+    def __init__(self):
+        self._stop_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+
+    @property
+    def is_stopped(self):
+        return self._stop_event.is_set()
+
+    @property
+    def is_paused(self):
+        return not self._resume_event.is_set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._resume_event.set()  # 一時停止中でも停止できるように待機を解除
+
+    def pause(self):
+        self._resume_event.clear()
+
+    def resume(self):
+        self._resume_event.set()
+
+    def checkpoint(self, log_func=None):
+        """日程の区切りで呼び出す。一時停止中は再開まで待機し、停止要求があれば JobCancelled を送出"""
+        if self.is_paused and not self.is_stopped:
+            if log_func:
+                log_func("一時停止中です。再開ボタンで処理を続行します。", color="orange")
+            self._resume_event.wait()
+        if self.is_stopped:
+            raise JobCancelled("停止ボタンにより処理を中断しました。")
+
+    def sleep(self, seconds):
+        """停止要求があればすぐに戻る sleep"""
+        self._stop_event.wait(seconds)
+
+class TransientError(Exception):
+    """403 Forbidden など、時間をおけば解消する可能性が高いエラー"""
+
+class SubmissionUnknownError(Exception):
+    """確定ボタンを押した後に失敗し、登録されたかどうか分からないエラー（二重登録を防ぐためリトライしない）"""
+
+class RetryHelper:
+    """日程ごとのエラーを分離し、一時的なエラーをリトライキューで再実行するヘルパークラス"""
+
+    TRANSIENT_MESSAGES = ("timeout", "net::", "navigation", "target closed", "403 forbidden")  # 小文字で比較する
+    _END = object()  # 項目の終わりを表す目印（None も項目になりうるため）
+
+    @staticmethod
+    def is_transient(error):
+        """タイムアウト・通信エラー・403 を一時的なエラーとみなす（講座名不一致や入力不備、確定後の失敗は恒久的）"""
+        if isinstance(error, SubmissionUnknownError):
+            return False
+        if isinstance(error, (PlaywrightTimeoutError, TransientError)):
+            return True
+        # expect(...) のタイムアウトは AssertionError（"... with timeout 30000ms" のような小文字のメッセージ）として送出される
+        if isinstance(error, (PlaywrightError, AssertionError)):
+            return any(message in str(error).lower() for message in RetryHelper.TRANSIENT_MESSAGES)
+        return False
+
+    @staticmethod
+    def run_with_retry_queue(items, process_func, describe_func, log_func, control=None,
+                             max_attempts=RETRY_MAX_ATTEMPTS, backoff_seconds=RETRY_BACKOFF_SECONDS,
+                             peek_func=None):
+        """
+        items の各項目に process_func を実行する（items はジェネレーターでもよく、1回目は順に取り出しながら処理する）。
+        process_func は成功で True、スキップで False を返す。
+        peek_func があれば、各項目の process_func の前に次に処理する項目（なければ None）を渡す。
+        一時的なエラーの項目は本処理の後にバックオフしながらリトライし、恒久的なエラーは即座に失敗とする。
+        停止要求があれば次の項目に進まずに終了し、未処理の件数を 'cancelled' に記録する。
+        戻り値は {'success': 件数, 'skipped': 件数, 'failed': [(項目, エラー)], 'cancelled': 件数}。
+        """
+        control = control or JobControl()
+        result = {'success': 0, 'skipped': 0, 'failed': [], 'cancelled': 0}
+        pending = items
+
+        for attempt in range(1, max_attempts + 1):
+            if attempt > 1:
+                wait_seconds = backoff_seconds * (2 ** (attempt - 2))
+                log_func(f"\n一時的なエラーで失敗した {len(pending)} 件を {wait_seconds} 秒後にリトライします（{attempt}/{max_attempts} 回目）", color="orange")
+                control.sleep(wait_seconds)
+
+            retry_queue = []
+            iterator = iter(pending)
+            # 次の項目を1つ先に取り出しておき、先読みできるようにする
+            next_item = next(iterator, RetryHelper._END)
+            while next_item is not RetryHelper._END:
+                item = next_item
+                next_item = next(iterator, RetryHelper._END)
+                try:
+                    control.checkpoint(log_func)
+                except JobCancelled as e:
+                    log_func(str(e), color="orange", weight=ft.FontWeight.BOLD)
+                    remaining = 0 if next_item is RetryHelper._END else 1 + sum(1 for _ in iterator)
+                    result['cancelled'] = 1 + remaining + len(retry_queue)
+                    return result
+                if peek_func:
+                    peek_func(None if next_item is RetryHelper._END else next_item)
+                try:
+                    if process_func(item):
+                        result['success'] += 1
+                    else:
+                        result['skipped'] += 1
+                except Exception as e:
+                    if RetryHelper.is_transient(e) and attempt < max_attempts:
+                        log_func(f"[一時的なエラー] {describe_func(item)}: {e}", color="orange")
+                        retry_queue.append(item)
+                    else:
+                        log_func(f"[エラー] {describe_func(item)}: {e}", color="red")
+                        result['failed'].append((item, e))
+
+            pending = retry_queue
+            if not pending:
+                break
+
+        return result
+
+    @staticmethod
+    def log_summary(result, describe_func, log_func):
+        """成功・スキップ・失敗の件数と、失敗した項目の一覧をログに出力"""
+        log_func(f"\n結果: 成功 {result['success']} 件 / スキップ {result['skipped']} 件 / 失敗 {len(result['failed'])} 件", weight=ft.FontWeight.BOLD)
+        if result.get('cancelled'):
+            log_func(f"停止により未処理: {result['cancelled']} 件", color="orange", weight=ft.FontWeight.BOLD)
+        if result['failed']:
+            log_func("以下の日程は処理できませんでした：", color="red", weight=ft.FontWeight.BOLD)
+            for item, error in result['failed']:
+                log_func(f"- {describe_func(item)}: {error}", color="red")
+
+class ScheduleRecord(NamedTuple):
+    """個別日程追加の1行分（値はすべて入力された文字列のまま保持する）"""
+    class_name: str
+    classdetailid: str
+    date: str
+    start: str
+    end: str
+    capacity: str
+    price: str
+    deadline: str
+    contact: str
+
+class EditRequest(NamedTuple):
+    """一括編集の1行分（対象は sessiondetailid か 日付+開始時刻、変更しない項目は None）"""
+    sessiondetailid: str
+    date: str
+    start: str
+    capacity: str
+    price: str
+    deadline: str
+    contact: str
+
+class RecurrenceRule(NamedTuple):
+    """連続日程追加の繰り返しルール（時刻は0時からの分数。default_times が None なら枠の長さから決める）"""
+    weekdays: frozenset
+    default_times: tuple
+    times_by_weekday: dict
+    exclusions: frozenset
+    slot_minutes: int
+
+class RecurrenceHelper:
+    """繰り返しルールの解析と、日程への展開を提供するヘルパークラス"""
+
+    WEEKDAY_NAMES = {'月': 0, '火': 1, '水': 2, '木': 3, '金': 4, '土': 5, '日': 6}
+
+    @staticmethod
+    def default_rule():
+        """ルール未入力時: 毎日、HOURS_TO_ADD の時間帯を1時間ずつ"""
+        return RecurrenceRule(
+            weekdays=frozenset(range(7)),
+            default_times=None,
+            times_by_weekday={},
+            exclusions=frozenset(),
+            slot_minutes=60,
+        )
+
+    @staticmethod
+    def default_times_for(slot_minutes):
+        """時間の指定がない場合の開始時刻: HOURS_TO_ADD の時間帯を枠の長さごとに区切る（60分なら HOURS_TO_ADD と同じ）"""
+        window_start = HOURS_TO_ADD[0] * 60
+        window_end = (HOURS_TO_ADD[-1] + 1) * 60
+        return tuple(range(window_start, window_end - slot_minutes + 1, slot_minutes))
+
+    @staticmethod
+    def start_times(rule, weekday, slot_minutes):
+        """指定の曜日の開始時刻（曜日ごとの指定 → 共通の時間 → 枠の長さから決めた時刻 の順に優先）"""
+        if weekday in rule.times_by_weekday:
+            return rule.times_by_weekday[weekday]
+        if rule.default_times is not None:
+            return rule.default_times
+        return RecurrenceHelper.default_times_for(slot_minutes)
+
+    @staticmethod
+    def validate(rule, slot_minutes=None):
+        """開始時刻の間隔が枠の長さより短く、枠同士が重なる場合は ValueError"""
+        slot = slot_minutes or rule.slot_minutes
+        if slot <= 0:
+            raise ValueError(f"枠の長さは1分以上で指定してください: {slot}")
+        for weekday in sorted(rule.weekdays):
+            times = RecurrenceHelper.start_times(rule, weekday, slot)
+            for previous, current in zip(times, times[1:]):
+                if current - previous < slot:
+                    name = next(key for key, value in RecurrenceHelper.WEEKDAY_NAMES.items() if value == weekday)
+                    raise ValueError(
+                        f"{name}曜日の {previous // 60}:{previous % 60:02d} と {current // 60}:{current % 60:02d} の枠が重なります"
+                        f"（枠の長さ {slot} 分）。開始時刻の間隔を広げるか、時間の指定を省略してください"
+                    )
+
+    @staticmethod
+    def weekday_number(name):
+        """'日' '日曜' '日曜日' のような曜日名を曜日番号にする（不明なら None）"""
+        return RecurrenceHelper.WEEKDAY_NAMES.get(re.sub(r'曜日?$', '', name.strip()))
+
+    @staticmethod
+    def parse_times(text):
+        """'8-12, 14:30, 19' のような時刻指定を分数のタプルにする（'8-12' は8時〜12時の毎正時）"""
+        times = set()
+        for part in re.split(r'[,、\s]+', text.strip()):
+            if not part:
+                continue
+            range_match = re.match(r'^(\d{1,2})[-~〜](\d{1,2})$', part)
+            time_match = re.match(r'^(\d{1,2})(?::(\d{2}))?$', part)
+            if range_match:
+                first, last = map(int, range_match.groups())
+                times.update(hour * 60 for hour in range(first, last + 1))
+            elif time_match:
+                times.add(int(time_match.group(1)) * 60 + int(time_match.group(2) or 0))
+            else:
+                raise ValueError(f"時刻の形式が正しくありません: {part}")
+        return tuple(sorted(times))
+
+    @staticmethod
+    def parse_weekdays(text):
+        """'月,水,金' や '月-金' を曜日番号の集合にする（'金-月' のような範囲は日曜をまたいで金〜月）"""
+        weekdays = set()
+        for part in re.split(r'[,、\s]+', text.strip()):
+            if not part:
+                continue
+            names = re.split(r'[-~〜]', part)
+            numbers = [RecurrenceHelper.weekday_number(name) for name in names]
+            if len(names) > 2 or None in numbers:
+                raise ValueError(f"曜日の形式が正しくありません: {part}")
+            first, last = numbers[0], numbers[-1]
+            weekdays.update((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+        return weekdays
+
+    @staticmethod
+    def parse_rule(text):
+        """
+        繰り返しルールのテキストを RecurrenceRule にする。空欄なら default_rule()。
+          曜日: 月,水,金     （省略時は毎日）
+          時間: 8-22         （全曜日共通の開始時刻。省略時は HOURS_TO_ADD の時間帯を枠の長さごとに区切る）
+          土: 10,13          （曜日ごとの開始時刻。共通の時間より優先し、その曜日は対象に含める）
+          除外: 2025-09-01, 2025-09-15
+          枠: 90             （1枠の長さ(分)。省略時は60）
+        """
+        rule = RecurrenceHelper.default_rule()
+        if not text or not text.strip():
+            return rule
+        weekdays = None
+        times_by_weekday = {}
+        exclusions = set()
+        for line in text.strip().splitlines():
+            if not line.strip():
+                continue
+            match = re.match(r'^\s*([^:：=]+?)\s*[:：=]\s*(.*)$', line)
+            if not match:
+                raise ValueError(f"ルールの形式が正しくありません: {line}")
+            key, value = match.groups()
+            if key == '曜日':
+                weekdays = RecurrenceHelper.parse_weekdays(value)
+            elif key == '時間':
+                rule = rule._replace(default_times=RecurrenceHelper.parse_times(value))
+            elif RecurrenceHelper.weekday_number(key) is not None:
+                times_by_weekday[RecurrenceHelper.weekday_number(key)] = RecurrenceHelper.parse_times(value)
+            elif key == '除外':
+                for part in re.split(r'[,、\s]+', value.strip()):
+                    if part:
+                        exclusions.add(date.fromisoformat(part))
+            elif key == '枠':
+                rule = rule._replace(slot_minutes=int(value))
+            else:
+                raise ValueError(f"不明なルールの項目です: {key}")
+        if weekdays is None:
+            # 曜日の指定がなく、曜日ごとの時間だけが指定されている場合はその曜日のみ
+            weekdays = set(times_by_weekday) or set(range(7))
+        else:
+            # 曜日ごとの時間を指定した曜日は対象に含める
+            weekdays |= set(times_by_weekday)
+        rule = rule._replace(weekdays=frozenset(weekdays), times_by_weekday=times_by_weekday, exclusions=frozenset(exclusions))
+        RecurrenceHelper.validate(rule)
+        return rule
+
+    @staticmethod
+    def expand(rule, start_date, end_date, slot_minutes=None):
+        """ルールを (日付, 開始分, 終了分) に1件ずつ展開するジェネレーター（日付を越える枠は作らない）"""
+        slot = slot_minutes or rule.slot_minutes
+        for single_date in RecurrenceHelper.dates(rule, start_date, end_date):
+            for start in RecurrenceHelper.start_times(rule, single_date.weekday(), slot):
+                if start + slot < 24 * 60:
+                    yield single_date, start, start + slot
+
+    @staticmethod
+    def dates(rule, start_date, end_date):
+        """ルールで日程を作る日付を順に返す"""
+        for single_date in daterange(start_date, end_date):
+            if single_date.weekday() in rule.weekdays and single_date not in rule.exclusions:
+                yield single_date
+
+    @staticmethod
+    def batched(records, batch_size=BATCH_SIZE):
+        """records を batch_size 件ずつのタプルにして順に返すジェネレーター（全件をまとめて保持しない）"""
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield tuple(batch)
+                batch = []
+        if batch:
+            yield tuple(batch)
+
 class ScheduleHelper:
     """日程関連の共通処理を提供するヘルパークラス"""
     
     @staticmethod
     def parse_custom_schedules(text):
-        """個別日程リストのテキストをパースして [(class_name, classdetailid, date, start, end, capacity, price, deadline, contact)] のリストにする"""
+        """個別日程リストのテキストをパースして ScheduleRecord(class_name, classdetailid, date, start, end, capacity, price, deadline, contact) のリストにする"""
         result = []
         lines = text.strip().splitlines()
         # ヘッダー行があればスキップ
@@ -83,7 +616,7 @@ class ScheduleHelper:
                     continue
                 class_name_part, classdetailid, date_part, time_part, capacity_part, price_part, deadline_part, contact_part = parts
                 start_time, end_time = time_part.split('~')
-                result.append((
+                result.append(ScheduleRecord(
                     class_name_part.strip(),
                     classdetailid.strip(),
                     date_part.strip(),
@@ -98,6 +631,36 @@ class ScheduleHelper:
                 continue
         return result
     
+    @staticmethod
+    def parse_edit_schedules(text):
+        """一括編集用のテキスト（対象\t定員\t受講料\t締め切り日時\t緊急連絡先）をパースして EditRequest のリストにする"""
+        result = []
+        lines = text.strip().splitlines()
+        # ヘッダー行があればスキップ
+        if lines and "対象" in lines[0]:
+            lines = lines[1:]
+
+        for line in lines:
+            if not line.strip():
+                continue
+            parts = [part.strip() for part in line.rstrip('\n').split('\t')]
+            if len(parts) < 2 or len(parts) > 5:
+                continue
+            parts += [''] * (5 - len(parts))
+            target, capacity, price, deadline, contact = parts
+            changes = [value or None for value in (capacity, price, deadline, contact)]
+            if not any(changes):
+                continue
+            target = target.replace('　', ' ')
+            if target.isdigit():
+                result.append(EditRequest(target, None, None, *changes))
+                continue
+            target_parts = re.split(r'\s+', target)
+            if (len(target_parts) == 2 and re.match(r'^\d{4}-\d{1,2}-\d{1,2}$', target_parts[0])
+                    and re.match(r'^\d{1,2}:\d{2}$', target_parts[1])):
+                result.append(EditRequest(None, target_parts[0], target_parts[1], *changes))
+        return result
+
     @staticmethod
     def parse_delete_schedules(text):
         """個別日程削除用のテキストをパースして [(date, start)] のリストにする"""
@@ -218,9 +781,52 @@ class ScheduleHelper:
                 pass
             return False
     
+    # 開いているページ（URL・フォームの送信先・隠し項目）が指定の日程のものかを確認するスクリプト
+    SESSION_CHECK_SCRIPT = """
+    (sessiondetailid) => {
+        const pattern = new RegExp('(^|[^0-9])' + sessiondetailid + '([^0-9]|$)');
+        if (pattern.test(location.pathname + location.search)) return true;
+        const forms = Array.from(document.querySelectorAll('form'));
+        if (forms.some(form => pattern.test(form.getAttribute('action') || ''))) return true;
+        return Array.from(document.querySelectorAll('input[type="hidden"]'))
+            .some(input => /session_?detail_?id/i.test(input.name) && input.value === sessiondetailid);
+    }
+    """
+
+    @staticmethod
+    def open_session_edit_page(session, sessiondetailid, is_organizer, log_func):
+        """
+        日程詳細ページから、その日程の編集ページを開く（戻り値は (ページ, 日程詳細ページから読み取った講座情報)）。
+        講座全体の編集ページを開いて講座の設定を書き換えないよう、リンクと開いたページの両方が
+        sessiondetailid のものであることを確認する。
+        """
+        session.goto(URLHelper.build_attendance_url(sessiondetailid, is_organizer=is_organizer), timeout=60000)
+        page = session.page
+        if not PlaywrightHelper.handle_403_forbidden(page, log_func, control=session.control):
+            raise TransientError("403 Forbidden")
+        source = page.evaluate(ScheduleCloner.SOURCE_SCRIPT)
+
+        edit_link = page.locator(f'a[href*="{sessiondetailid}"]').filter(has_text=re.compile("編集")).first
+        try:
+            expect(edit_link).to_be_visible(timeout=15000)
+        except AssertionError:
+            raise Exception(f"日程 {sessiondetailid} の編集リンクが見つかりません")
+        edit_link.click()
+        page.wait_for_load_state()
+
+        belongs = page.evaluate(ScheduleHelper.SESSION_CHECK_SCRIPT, str(sessiondetailid))
+        if not belongs:
+            raise Exception(f"開いた編集ページが日程 {sessiondetailid} のものか確認できないため中断します: {page.url}")
+        return page, source
+
     @staticmethod
-    def find_and_delete_schedules(page, log_func, class_names, start_time=None, max_pages=10):
-        """指定された条件に一致する日程を探して削除する（ページング対応）"""
+    def find_and_delete_schedules(page, log_func, class_names, start_time=None, max_pages=10, control=None, stats=None):
+        """
+        指定された条件に一致する日程を探して削除する（ページング対応）。
+        stats（{'deleted': 件数, 'skipped': 件数}）を渡すと、削除・スキップした件数を加算する。
+        """
+        control = control or JobControl()
+        stats = stats if stats is not None else {'deleted': 0, 'skipped': 0}
         found_any = False
         page_count = 0
         skipped_texts = set()
@@ -260,10 +866,14 @@ class ScheduleHelper:
                     except Exception:
                         candidate_text_clean = None
                     
+                    # 1件の削除を始める前に停止・一時停止を確認する（削除の途中では中断しない）
+                    control.checkpoint(log_func)
                     if ScheduleHelper.delete_schedule(page, target_link, log_func):
                         found_any = True
+                        stats['deleted'] += 1
                         continue
                     else:
+                        stats['skipped'] += 1
                         # スキップ（予約者あり等）やエラーの場合でも同一ページ内の次候補を続行する
                         if candidate_text_clean:
                             skipped_texts.add(candidate_text_clean)
@@ -280,7 +890,7 @@ class ScheduleHelper:
                 if href:
                     next_url = BASE_URL + href
                     page.goto(next_url, timeout=60000)
-                    if not PlaywrightHelper.handle_403_forbidden(page, log_func):
+                    if not PlaywrightHelper.handle_403_forbidden(page, log_func, control=control):
                         break
                     continue
             
@@ -289,6 +899,562 @@ class ScheduleHelper:
         
         return found_any
 
+    @staticmethod
+    def log_delete_summary(stats, remaining, unit, log_func):
+        """削除・スキップした件数と、停止などで処理しなかった件数をログに出力"""
+        log_func(f"\n結果: 削除 {stats['deleted']} 件 / スキップ {stats['skipped']} 件", weight=ft.FontWeight.BOLD)
+        if remaining:
+            log_func(f"停止により未処理: {remaining} {unit}", color="orange", weight=ft.FontWeight.BOLD)
+
+class FormFiller:
+    """日程追加フォームへの入力を提供するヘルパークラス"""
+
+    # 締め切りの単位ごとの (ラジオボタンID, 入力欄ID)
+    DEADLINE_FIELDS = {
+        '日前': ("#session_detail_multi_form_select_deadline_type_0", "#session_detail_multi_form_deadline_days_ago"),
+        '時間前': ("#session_detail_multi_form_select_deadline_type_1", "#session_detail_multi_form_deadline_hours_ago"),
+        '分前': ("#session_detail_multi_form_select_deadline_type_2", "#session_detail_multi_form_deadline_minutes_ago"),
+    }
+
+    # 各スクリプトで共通のヘルパー関数。
+    # ページ側のJSが値の変更を検知できるよう、入力ごとに input / change イベントを発火する。
+    JS_HELPERS = """
+        const fire = (el) => {
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+        };
+        const setText = (selector, value) => {
+            const el = document.querySelector(selector);
+            if (!el || value === null) return;
+            el.focus();
+            el.value = value;
+            fire(el);
+            el.blur();
+        };
+        const check = (selector) => {
+            const el = document.querySelector(selector);
+            if (el && !el.checked) el.click();
+        };
+        const selectOption = (el, value) => {
+            if (!el) return;
+            // "0" と "00" のような表記ゆれは数値として比較する
+            const option = Array.from(el.options).find(o =>
+                o.value === value || o.text.trim() === value || (/^\\d+$/.test(o.value) && Number(o.value) === Number(value)));
+            if (!option) return;
+            el.value = option.value;
+            fire(el);
+        };
+        const selected = (el) => {
+            if (!el || el.selectedIndex < 0) return null;
+            const option = el.options[el.selectedIndex];
+            return [option.value, option.text.trim()];
+        };
+"""
+
+    # フォーム全体を1回で入力し、入力後の値を返すスクリプト
+    FILL_SCRIPT = """
+    (v) => {
+""" + JS_HELPERS + """
+        const online = document.querySelector('#session_detail_multi_form_is_online_true') || document.querySelector('#is_online_check');
+        if (online && online.offsetParent !== null && !online.checked) online.click();
+
+        setText('#session_detail_multi_form_session_capacity', v.capacity);
+
+        const block = document.querySelector('div[data-repeater-item]');
+        const q = (selector) => block ? block.querySelector(selector) : null;
+        // 年・月を先に確定させてから日を選ぶ（月の変更で日の選択肢が作り直される場合があるため）
+        selectOption(q('select[name*="[session_startdate_year]"]'), v.year);
+        selectOption(q('select[name*="[session_startdate_month]"]'), v.month);
+        selectOption(q('select[name*="[session_startdate_day]"]'), v.day);
+        selectOption(q('select.js_start_time_hour'), v.start_hour);
+        selectOption(q('select.js_start_time_minute'), v.start_minute);
+        selectOption(q('select.js_end_time_hour'), v.end_hour);
+        selectOption(q('select.js_end_time_minute'), v.end_minute);
+
+        if (v.deadline_radio) {
+            check(v.deadline_radio);
+            setText(v.deadline_input, v.deadline_value);
+        }
+        setText('#session_detail_multi_form_cost', v.cost);
+        setText('#session_detail_multi_form_emergency_contact', v.contact);
+
+        const value = (selector) => {
+            const el = document.querySelector(selector);
+            return el ? el.value : null;
+        };
+        return {
+            capacity: value('#session_detail_multi_form_session_capacity'),
+            year: selected(q('select[name*="[session_startdate_year]"]')),
+            month: selected(q('select[name*="[session_startdate_month]"]')),
+            day: selected(q('select[name*="[session_startdate_day]"]')),
+            start_hour: selected(q('select.js_start_time_hour')),
+            start_minute: selected(q('select.js_start_time_minute')),
+            end_hour: selected(q('select.js_end_time_hour')),
+            end_minute: selected(q('select.js_end_time_minute')),
+            deadline_checked: v.deadline_radio ? !!(document.querySelector(v.deadline_radio) || {}).checked : null,
+            deadline_value: v.deadline_input ? value(v.deadline_input) : null,
+            cost: value('#session_detail_multi_form_cost'),
+            contact: value('#session_detail_multi_form_emergency_contact'),
+        };
+    }
+    """
+
+    SELECT_KEYS = ('year', 'month', 'day', 'start_hour', 'start_minute', 'end_hour', 'end_minute')
+
+    # 複製した日程ブロック（2つ目以降）の日付・時刻をまとめて設定し、設定後の値を返すスクリプト
+    BLOCKS_SCRIPT = """
+    (blocks) => {
+""" + JS_HELPERS + """
+        const items = document.querySelectorAll('div[data-repeater-item]');
+        return blocks.map((v, i) => {
+            const block = items[v.index];
+            if (!block) return null;
+            const q = (selector) => block.querySelector(selector);
+            selectOption(q('select[name*="[session_startdate_year]"]'), v.year);
+            selectOption(q('select[name*="[session_startdate_month]"]'), v.month);
+            selectOption(q('select[name*="[session_startdate_day]"]'), v.day);
+            selectOption(q('select.js_start_time_hour'), v.start_hour);
+            selectOption(q('select.js_start_time_minute'), v.start_minute);
+            selectOption(q('select.js_end_time_hour'), v.end_hour);
+            selectOption(q('select.js_end_time_minute'), v.end_minute);
+            return {
+                year: selected(q('select[name*="[session_startdate_year]"]')),
+                month: selected(q('select[name*="[session_startdate_month]"]')),
+                day: selected(q('select[name*="[session_startdate_day]"]')),
+                start_hour: selected(q('select.js_start_time_hour')),
+                start_minute: selected(q('select.js_start_time_minute')),
+                end_hour: selected(q('select.js_end_time_hour')),
+                end_minute: selected(q('select.js_end_time_minute')),
+            };
+        });
+    }
+    """
+
+    @staticmethod
+    def parse_deadline(deadline_str):
+        """'1日前' などの締め切り文字列を (単位, 値) にする（解析できない場合は None）"""
+        for unit in FormFiller.DEADLINE_FIELDS:
+            if unit in deadline_str:
+                return unit, deadline_str.replace(unit, '').strip()
+        return None
+
+    @staticmethod
+    def build_values(record):
+        """ScheduleRecord からスクリプトに渡す入力値を作る"""
+        y, m, d = map(int, record.date.split('-'))
+        start_hour, start_min = map(int, record.start.split(':'))
+        end_hour, end_min = map(int, record.end.split(':'))
+        values = {
+            'capacity': record.capacity,
+            'year': str(y),
+            'month': str(m),
+            'day': str(d),
+            'start_hour': str(start_hour),
+            'start_minute': str(start_min),
+            'end_hour': str(end_hour),
+            'end_minute': str(end_min),
+            'deadline_radio': None,
+            'deadline_input': None,
+            'deadline_value': None,
+            'cost': record.price,
+            'contact': record.contact,
+        }
+        deadline = FormFiller.parse_deadline(record.deadline) if record.deadline else None
+        if deadline:
+            unit, value = deadline
+            values['deadline_radio'], values['deadline_input'] = FormFiller.DEADLINE_FIELDS[unit]
+            values['deadline_value'] = value
+        return values
+
+    @staticmethod
+    def find_mismatches(values, actual):
+        """入力したい値と読み戻した値を比較し、一致しない項目名のリストを返す"""
+        mismatches = []
+        for key in ('capacity', 'cost', 'contact'):
+            # None の項目はフォームの初期値のままにしている
+            if values.get(key) is not None and actual.get(key) != values[key]:
+                mismatches.append(key)
+        for key in FormFiller.SELECT_KEYS:
+            selected = (actual or {}).get(key) or []
+            if not any(v == values[key] or (v.isdigit() and int(v) == int(values[key])) for v in selected):
+                mismatches.append(key)
+        if values['deadline_radio']:
+            if not actual.get('deadline_checked'):
+                mismatches.append('deadline_type')
+            if actual.get('deadline_value') != values['deadline_value']:
+                mismatches.append('deadline_value')
+        return mismatches
+
+    @staticmethod
+    def fill(page, record, log_func):
+        """フォームの全項目を1回のスクリプト実行で入力・検証する（すべて一致すれば True）"""
+        values = FormFiller.build_values(record)
+        if record.deadline and not values['deadline_radio']:
+            log_func(f"警告: 解析できない締め切りフォーマットです: {record.deadline}")
+        actual = page.evaluate(FormFiller.FILL_SCRIPT, values)
+        mismatches = FormFiller.find_mismatches(values, actual)
+        if mismatches:
+            log_func(f"  - 入力値が反映されなかった項目: {', '.join(mismatches)}")
+            return False
+        filled = [f"{record.date} {record.start}~{record.end}"]
+        for label, value, suffix in (("定員", record.capacity, ""), ("締め切り", record.deadline, ""), ("受講料", record.price, " 円"), ("緊急連絡先", record.contact, "")):
+            if value:
+                filled.append(f"{label} {value}{suffix}")
+        log_func(f"{' / '.join(filled)} を入力しました。")
+        return True
+
+    @staticmethod
+    def fill_blocks(page, records):
+        """2件目以降の日程を、複製済みの日程ブロックに1回のスクリプト実行で設定する（一致しなかった日程のリストを返す）"""
+        blocks = []
+        for index, record in enumerate(records, 1):
+            values = FormFiller.build_values(record)
+            blocks.append(dict({key: values[key] for key in FormFiller.SELECT_KEYS}, index=index))
+        actual_blocks = page.evaluate(FormFiller.BLOCKS_SCRIPT, blocks)
+        return [
+            record for record, values, actual in zip(records, blocks, actual_blocks)
+            if FormFiller.find_mismatches(dict(values, deadline_radio=None), actual or {})
+        ]
+
+    # 編集フォームの項目（新規・編集のどちらのフォームでも見つかるよう name / id の末尾で指定する）
+    EDIT_FIELDS = {
+        'capacity': '[name$="[session_capacity]"]',
+        'price': '[name$="[cost]"]',
+        'contact': '[name$="[emergency_contact]"]',
+    }
+    EDIT_DEADLINE_FIELDS = {
+        '日前': ('[id$="select_deadline_type_0"]', '[name$="[deadline_days_ago]"]'),
+        '時間前': ('[id$="select_deadline_type_1"]', '[name$="[deadline_hours_ago]"]'),
+        '分前': ('[id$="select_deadline_type_2"]', '[name$="[deadline_minutes_ago]"]'),
+    }
+
+    # 編集フォームの変更を1回で反映し、反映後の値を返すスクリプト（changes が null なら読み取りのみ）
+    EDIT_SCRIPT = """
+    ([fields, deadlineFields, changes]) => {
+        const fire = (el) => {
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+        };
+        if (changes) {
+            for (const [key, selector] of Object.entries(fields)) {
+                const el = document.querySelector(selector);
+                if (el && changes[key] !== null) {
+                    el.value = changes[key];
+                    fire(el);
+                }
+            }
+            if (changes.deadline) {
+                const [radioSelector, inputSelector] = deadlineFields[changes.deadline[0]];
+                const radio = document.querySelector(radioSelector);
+                if (radio && !radio.checked) radio.click();
+                const input = document.querySelector(inputSelector);
+                if (input) {
+                    input.value = changes.deadline[1];
+                    fire(input);
+                }
+            }
+        }
+        const current = {};
+        for (const [key, selector] of Object.entries(fields)) {
+            const el = document.querySelector(selector);
+            current[key] = el ? el.value : null;
+        }
+        current.deadline = null;
+        for (const [unit, [radioSelector, inputSelector]] of Object.entries(deadlineFields)) {
+            const radio = document.querySelector(radioSelector);
+            const input = document.querySelector(inputSelector);
+            if (radio && radio.checked && input) current.deadline = input.value + unit;
+        }
+        return current;
+    }
+    """
+
+    @staticmethod
+    def edit_form_values(page, changes=None):
+        """編集フォームの現在値を読み取る（changes を渡すと反映してから読み取る）"""
+        payload = None
+        if changes is not None:
+            payload = {key: changes.get(key) for key in FormFiller.EDIT_FIELDS}
+            deadline = FormFiller.parse_deadline(changes['deadline']) if changes.get('deadline') else None
+            payload['deadline'] = list(deadline) if deadline else None
+        return page.evaluate(FormFiller.EDIT_SCRIPT, [FormFiller.EDIT_FIELDS, FormFiller.EDIT_DEADLINE_FIELDS, payload])
+
+    # フォームに表示されたエラーメッセージを集めるスクリプト
+    ERROR_MESSAGES_SCRIPT = """
+    () => Array.from(document.querySelectorAll('#error_explanation, .alert-danger, .alert-error, .error-message, .field_with_errors + .error, .help-block.error'))
+        .map(el => el.textContent.replace(/\\s+/g, ' ').trim())
+        .filter(text => text)
+    """
+
+    @staticmethod
+    def find_edit_differences(changes, current):
+        """変更したい値のうち、現在値と異なる項目名のリストを返す"""
+        def normalize(key, value):
+            if value is None:
+                return None
+            value = value.replace(',', '').strip()
+            if key == 'deadline':
+                deadline = FormFiller.parse_deadline(value)
+                return (deadline[0], deadline[1].lstrip('0') or '0') if deadline else value
+            return value
+
+        return [
+            key for key, value in changes.items()
+            if value is not None and normalize(key, value) != normalize(key, current.get(key))
+        ]
+
+    @staticmethod
+    def fill_with_locators(page, record, log_func):
+        """項目ごとにロケーター操作でフォームを入力する（一括入力が反映されなかった場合の予備）"""
+        _, _, date_str, start_str, end_str, capacity_str, price_str, deadline_str, contact_str = record
+
+        # オンライン選択肢があれば選択
+        online_radio_button = page.locator("#session_detail_multi_form_is_online_true, #is_online_check").first
+        if online_radio_button.is_visible():
+            log_func("開催形式の選択肢を検出。「オンライン」を選択します。")
+            online_radio_button.check()
+            expect(online_radio_button).to_be_checked()
+            log_func("「オンライン」を選択しました。")
+
+        # 定員を設定 (日程より前に設定。None の項目はフォームの初期値のままにする)
+        if capacity_str is not None:
+            page.locator("#session_detail_multi_form_session_capacity").fill(capacity_str)
+            log_func(f"定員を {capacity_str} に設定しました。")
+
+        first_block = page.locator('div[data-repeater-item]').first
+        y, m, d = map(int, date_str.split('-'))
+        first_block.locator('select[name*="[session_startdate_year]"]').select_option(str(y))
+        first_block.locator('select[name*="[session_startdate_month]"]').select_option(str(m))
+        first_block.locator('select[name*="[session_startdate_day]"]').select_option(str(d))
+        start_hour, start_min = map(int, start_str.split(':'))
+        end_hour, end_min = map(int, end_str.split(':'))
+        first_block.locator('select.js_start_time_hour').select_option(str(start_hour))
+        first_block.locator('select.js_start_time_minute').select_option(str(start_min))
+        first_block.locator('select.js_end_time_hour').select_option(str(end_hour))
+        first_block.locator('select.js_end_time_minute').select_option(str(end_min))
+        log_func(f"{start_hour:02d}:{start_min:02d} - {end_hour:02d}:{end_min:02d} の日程を設定しました。")
+
+        # 締め切り日時を設定
+        if deadline_str:
+            try:
+                parsed = FormFiller.parse_deadline(deadline_str)
+                if parsed:
+                    unit, value = parsed
+                    radio_selector, input_selector = FormFiller.DEADLINE_FIELDS[unit]
+                    page.locator(radio_selector).check()
+                    page.locator(input_selector).fill(value)
+                    log_func(f"締め切りを {value} {unit}に設定しました。")
+                else:
+                    log_func(f"警告: 解析できない締め切りフォーマットです: {deadline_str}")
+            except Exception as e:
+                log_func(f"締め切り日時の設定中にエラーが発生しました: {e}")
+
+        # 受講料を設定
+        if price_str is not None:
+            page.locator("#session_detail_multi_form_cost").fill(price_str)
+            log_func(f"受講料を {price_str} 円に設定しました。")
+
+        # 緊急連絡先を設定
+        if contact_str is not None:
+            page.locator("#session_detail_multi_form_emergency_contact").fill(contact_str)
+            log_func(f"緊急連絡先を {contact_str} に設定しました。")
+
+class ScheduleSubmitter:
+    """日程追加フォームの送信を提供するヘルパークラス"""
+
+    @staticmethod
+    def build_add_url(classdetailid):
+        """日程追加ページのURLを構築"""
+        return f"{BASE_URL}/session_details/new_multi_session?classdetailid={classdetailid}"
+
+    @staticmethod
+    def submit_form(page, log_func):
+        """入力済みのフォームをプレビュー・確定し、完了ページへの遷移を待つ"""
+        ScheduleSubmitter.confirm(page, log_func)
+        ScheduleSubmitter.wait_for_completion(page, log_func)
+
+    @staticmethod
+    def confirm(page, log_func):
+        """入力済みのフォームをプレビューし、確定ボタンを押す（完了ページは待たない）"""
+        page.get_by_role("button", name="プレビュー画面で確認").click()
+        confirm_button = page.get_by_role("button", name="確定")
+        expect(confirm_button).to_be_visible(timeout=15000)
+        time.sleep(1)
+        try:
+            confirm_button.click()
+        except Exception as e:
+            raise SubmissionUnknownError(f"確定ボタンの操作中にエラーが発生しました。登録されている可能性があるため、日程一覧を確認してください: {e}") from e
+
+    @staticmethod
+    def wait_for_completion(page, log_func):
+        """確定後、完了ページへの遷移を待つ"""
+        log_func("完了ページへの遷移を待っています...")
+        button1 = page.get_by_role("link", name="集客する")
+        button2 = page.get_by_role("link", name="日程追加")
+        try:
+            expect(button1.or_(button2).first).to_be_visible(timeout=20000)
+        except Exception as e:
+            # 確定は送信済みのため、サーバー側では登録されていることが多い。リトライすると二重登録になる
+            raise SubmissionUnknownError(f"確定後に完了ページを確認できませんでした。登録されている可能性があるため、日程一覧を確認してください: {e}") from e
+
+    @staticmethod
+    def open_form(session, classdetailid, log_func, page=None):
+        """日程追加ページを開き、フォームが表示されるまで待つ（page 省略時は現在のページ）"""
+        session.goto(ScheduleSubmitter.build_add_url(classdetailid), page=page)
+        page = page or session.page
+        if not PlaywrightHelper.handle_403_forbidden(page, log_func, control=session.control):
+            raise TransientError("403 Forbidden")
+        try:
+            expect(page.get_by_role("button", name="日程を複製する")).to_be_visible(timeout=30000)
+        except AssertionError as e:
+            raise TransientError(f"日程追加フォームが表示されませんでした: {e}") from e
+        return page
+
+    @staticmethod
+    def group_batches(records, batch_size=BATCH_SIZE):
+        """講座と共通設定（定員・受講料・締め切り・連絡先）が同じ日程ごとに、batch_size 件ずつのまとまりにする"""
+        groups = {}
+        for record in sorted(records, key=lambda r: (tuple(map(int, r.date.split('-'))), ConflictChecker.to_minutes(r.start))):
+            key = (record.classdetailid, record.capacity, record.price, record.deadline, record.contact)
+            groups.setdefault(key, []).append(record)
+        batches = []
+        for group in groups.values():
+            for index in range(0, len(group), batch_size):
+                batches.append(tuple(group[index:index + batch_size]))
+        return batches
+
+    @staticmethod
+    def submit_batch(session, records, log_func):
+        """同じ講座・同じ設定の複数の日程を、日程ブロックを複製して1回のフォーム送信で追加する"""
+        page = ScheduleSubmitter.prepare_batch(session, records, log_func)
+        ScheduleSubmitter.submit_form(page, log_func)
+        return True
+
+    @staticmethod
+    def prepare_batch(session, records, log_func, page=None):
+        """同じ講座・同じ設定の複数の日程を、日程ブロックを複製してフォームに入力する（送信はしない）"""
+        page = ScheduleSubmitter.open_form(session, records[0].classdetailid, log_func, page=page)
+        duplicate_button = page.get_by_role("button", name="日程を複製する")
+
+        # 共通の設定と1件目の日程を入力し、2件目以降は日程ブロックを複製してまとめて設定する
+        if not FormFiller.fill(page, records[0], log_func):
+            log_func("一括入力の検証に失敗したため、項目ごとの入力に切り替えます。")
+            FormFiller.fill_with_locators(page, records[0], log_func)
+        if len(records) > 1:
+            for _ in records[1:]:
+                duplicate_button.click()
+            expect(page.locator('div[data-repeater-item]')).to_have_count(len(records))
+            unmatched = FormFiller.fill_blocks(page, records[1:])
+            if unmatched:
+                raise Exception(f"日程ブロックに反映できなかった日程があります: {', '.join(f'{r.date} {r.start}' for r in unmatched)}")
+            log_func(f"残り {len(records) - 1} 件の日程を設定しました。")
+        return page
+
+class SubmitPipeline:
+    """
+    確定後の完了ページ待ちの間に、もう1枚のページで次の項目のフォームを読み込み・入力しておく。
+    prepare_func(item, page) は page にフォームを入力して True、スキップする場合は False を返す。
+    """
+
+    def __init__(self, session, prepare_func, describe_func, log_func, enabled=PIPELINE_MODE):
+        self.session = session
+        self.prepare_func = prepare_func
+        self.describe_func = describe_func
+        self.log_func = log_func
+        self.enabled = enabled
+        self.upcoming = None  # 次に処理する項目
+        self.prefetched = None  # 先読み済みの (項目, prepare_func の結果)
+
+    def peek(self, item):
+        """次に処理する項目を受け取る（RetryHelper.run_with_retry_queue の peek_func に渡す）"""
+        self.upcoming = item
+
+    def submit(self, item):
+        """項目のフォームを確定し、完了を待つ間に次の項目を先読みする（成功で True、スキップで False）"""
+        prefetched, self.prefetched = self.prefetched, None
+        if prefetched is not None and prefetched[0] == item:
+            prepared = prefetched[1]
+            self.session.swap_pages()
+        else:
+            prepared = self.prepare_func(item, None)
+        if not prepared:
+            self.prefetch_upcoming()
+            return False
+
+        page = self.session.page
+        ScheduleSubmitter.confirm(page, self.log_func)
+        self.prefetch_upcoming()
+        ScheduleSubmitter.wait_for_completion(page, self.log_func)
+        return True
+
+    def prefetch_upcoming(self):
+        """次の項目のフォームを先読み用のページに入力しておく（失敗しても次の項目は通常どおり処理される）"""
+        item, self.upcoming = self.upcoming, None
+        if not self.enabled or item is None:
+            return
+        if self.session.should_recycle():
+            # ページを作り直すと先読みしたページも閉じてしまうため、次の項目の処理で作り直す
+            return
+        self.log_func(f"確定を待つ間に次のフォームを読み込みます: {self.describe_func(item)}")
+        try:
+            self.prefetched = (item, self.prepare_func(item, self.session.get_spare_page()))
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.log_func(f"[先読み失敗] {self.describe_func(item)}: {e}（通常どおり読み込み直します）", color="orange")
+
+class ScheduleCloner:
+    """既存の日程の設定を読み取って複製するヘルパークラス"""
+
+    # 日程詳細・編集ページから講座IDと講座名を読み取るスクリプト
+    SOURCE_SCRIPT = """
+    () => {
+        let classdetailid = null;
+        const input = document.querySelector('input[name$="[classdetailid]"], input[name="classdetailid"]');
+        if (input && input.value) classdetailid = input.value;
+        if (!classdetailid) {
+            const link = document.querySelector('a[href*="classdetailid="]');
+            const match = link ? link.href.match(/classdetailid=(\\d+)/) : null;
+            if (match) classdetailid = match[1];
+        }
+        const title = Array.from(document.querySelectorAll('p, h1, h2, h3'))
+            .map(el => el.textContent)
+            .find(text => text.includes('『'));
+        const match = title ? title.match(/『(.+?)』/) : null;
+        return { classdetailid, class_name: match ? match[1].trim() : null };
+    }
+    """
+
+    @staticmethod
+    def minutes_to_time(minutes):
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    @staticmethod
+    def read_source(session, sessiondetailid, listing_text, source_date, is_organizer, log_func):
+        """複製元の日程を開き、講座ID・時刻・定員・受講料・締め切り・連絡先を ScheduleRecord として返す"""
+        times = ConflictChecker.parse_listing_times(listing_text)
+        if times is None or len(re.findall(r'\d{1,2}:\d{2}', listing_text)) < 2:
+            raise Exception("日程一覧から開始・終了時刻を読み取れませんでした")
+
+        page, source = ScheduleHelper.open_session_edit_page(session, sessiondetailid, is_organizer, log_func)
+        edit_source = page.evaluate(ScheduleCloner.SOURCE_SCRIPT)
+        values = FormFiller.edit_form_values(page)
+
+        classdetailid = source['classdetailid'] or edit_source['classdetailid']
+        if not classdetailid:
+            raise Exception("講座IDを読み取れませんでした")
+        return ScheduleRecord(
+            source['class_name'] or edit_source['class_name'] or '',
+            classdetailid,
+            source_date.isoformat(),
+            ScheduleCloner.minutes_to_time(times[0]),
+            ScheduleCloner.minutes_to_time(times[1]),
+            values.get('capacity'),
+            values.get('price'),
+            values.get('deadline'),
+            values.get('contact'),
+        )
+
 class URLHelper:
     """URL関連の共通処理を提供するヘルパークラス"""
     
@@ -298,11 +1464,364 @@ class URLHelper:
         base_url = ORGANIZER_SCHEDULE_URL if is_organizer else TEACHER_SCHEDULE_URL
         return f"{base_url}?date={date_param}"
     
+    @staticmethod
+    def build_attendance_url(sessiondetailid, is_organizer=IS_ORGANIZER):
+        """日程詳細（予約状況）ページのURLを構築"""
+        base_url = ORGANIZER_SCHEDULE_URL if is_organizer else TEACHER_SCHEDULE_URL
+        return f"{base_url.rsplit('/', 1)[0]}/show_attendance?sessiondetailid={sessiondetailid}"
+
     @staticmethod
     def format_date_param(target_date):
         """日付パラメータをフォーマット"""
         return f"{target_date.year}-{target_date.month}-{target_date.day}"
 
+class RateLimiter:
+    """複数スレッドで共有するリクエスト間隔の制御"""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self, control=None):
+        """前回のリクエストから min_interval 秒経過するまで待機（control があれば待機中の停止・一時停止に応じる）"""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.min_interval
+        if wait_time > 0:
+            if control:
+                control.sleep(wait_time)
+            else:
+                time.sleep(wait_time)
+        if control:
+            control.checkpoint()
+
+    def backoff(self, seconds):
+        """403 Forbidden 等を受けたとき、全ワーカーのリクエストを一時停止"""
+        with self._lock:
+            self._next_time = max(self._next_time, time.monotonic() + seconds)
+
+class ScheduleListingParser(HTMLParser):
+    """日程一覧ページのHTMLから日程リンクと次ページURLを抽出する"""
+
+    # リンク内のテキストで改行として扱うタグ（それ以外のタグの前後はそのままつなげる。inner_text() と同じ扱い）
+    BLOCK_TAGS = {'br', 'div', 'p', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'dl', 'dt', 'dd', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+    def __init__(self):
+        super().__init__()
+        self.sessions = []  # [(sessiondetailid, text)]
+        self.next_href = None
+        self.has_no_schedule_text = False
+        self._current_href = None
+        self._current_texts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS and self._current_href is not None:
+            self._current_texts.append('\n')
+        if tag != 'a':
+            return
+        attrs = dict(attrs)
+        href = attrs.get('href') or ''
+        classes = (attrs.get('class') or '').split()
+        if 'dashboard-session_container' in classes and '/show_attendance?sessiondetailid=' in href:
+            self._current_href = href
+            self._current_texts = []
+        elif attrs.get('rel') == 'next' and self.next_href is None:
+            self.next_href = href
+
+    def handle_endtag(self, tag):
+        if tag in self.BLOCK_TAGS and self._current_href is not None:
+            self._current_texts.append('\n')
+        if tag == 'a' and self._current_href is not None:
+            match = re.search(r'sessiondetailid=(\d+)', self._current_href)
+            sessiondetailid = match.group(1) if match else None
+            lines = (re.sub(r'\s+', ' ', line).strip() for line in ''.join(self._current_texts).split('\n'))
+            self.sessions.append((sessiondetailid, '\n'.join(line for line in lines if line)))
+            self._current_href = None
+
+    def handle_data(self, data):
+        if "講座がありません" in data:
+            self.has_no_schedule_text = True
+        if self._current_href is not None:
+            self._current_texts.append(data)
+
+class ScheduleScanner:
+    """日程一覧をHTTPリクエストで並列に取得し、対象日程のある日付を洗い出す"""
+
+    @staticmethod
+    def fetch_listing(request_context, url, limiter, log_func, max_retries=3, control=None):
+        """1ページ分の日程一覧を取得してパースする（403の場合は全体で待機してリトライ）"""
+        for _ in range(max_retries):
+            limiter.wait(control)
+            response = request_context.get(url, timeout=60000)
+            body_html = response.text()
+            if response.status == 403 or "403 Forbidden" in body_html:
+                log_func("403 Forbidden画面を検知。2分間待機してリトライします。")
+                limiter.backoff(120)
+                continue
+            parser = ScheduleListingParser()
+            parser.feed(body_html)
+            if not parser.sessions and not parser.has_no_schedule_text:
+                # ログイン画面（認証の期限切れ）や描画前のページを「日程なし」と取り違えないようにする
+                raise Exception(f"日程一覧を読み取れませんでした（ログインの有効期限が切れている可能性があります）: {response.url}")
+            return parser
+        raise Exception("403 Forbiddenが解消しませんでした。")
+
+    @staticmethod
+    def scan_date(request_context, target_date, is_organizer, limiter, log_func, max_pages=10, control=None):
+        """指定日の日程一覧（全ページ）を取得して [(sessiondetailid, text)] を返す"""
+        date_param = URLHelper.format_date_param(target_date)
+        url = URLHelper.build_schedule_url(date_param, is_organizer=is_organizer)
+        sessions = []
+        for _ in range(max_pages):
+            parser = ScheduleScanner.fetch_listing(request_context, url, limiter, log_func, control=control)
+            sessions.extend(parser.sessions)
+            if not parser.next_href:
+                break
+            url = BASE_URL + parser.next_href
+        return sessions
+
+    @staticmethod
+    def scan_dates(dates, is_organizer, log_func, workers=SCAN_WORKERS, min_interval=SCAN_MIN_INTERVAL, control=None):
+        """
+        複数の日付の日程一覧を並列に取得する。
+        戻り値は {date: [(sessiondetailid, text)]} で、取得に失敗した日付は値が None になる。
+        停止要求があった場合は JobCancelled を送出する。
+        """
+        control = control or JobControl()
+        if not os.path.exists(AUTH_FILE_PATH):
+            raise Exception("認証ファイル 'playwright_auth.json' が見つかりません。")
+
+        date_queue = queue.Queue()
+        for target_date in dates:
+            date_queue.put(target_date)
+        limiter = RateLimiter(min_interval)
+        results = {}
+        results_lock = threading.Lock()
+
+        def worker():
+            # sync APIはスレッドをまたいで使えないため、ワーカーごとに起動する
+            try:
+                with sync_playwright() as p:
+                    request_context = p.request.new_context(storage_state=AUTH_FILE_PATH)
+                    try:
+                        while not control.is_stopped:
+                            try:
+                                target_date = date_queue.get_nowait()
+                            except queue.Empty:
+                                break
+                            try:
+                                sessions = ScheduleScanner.scan_date(request_context, target_date, is_organizer, limiter, log_func, control=control)
+                            except JobCancelled:
+                                break
+                            except Exception as e:
+                                log_func(f"  - {target_date.strftime('%Y-%m-%d')} の日程一覧の取得に失敗しました: {e}")
+                                sessions = None
+                            with results_lock:
+                                results[target_date] = sessions
+                    finally:
+                        request_context.dispose()
+            except Exception as e:
+                # 起動に失敗したワーカーの日付は、他のワーカーが取得するか取得失敗として扱う
+                log_func(f"  - 日程一覧の取得ワーカーを起動できませんでした: {e}")
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, min(workers, len(dates))))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        control.checkpoint(log_func)
+        # 結果のない日付（ワーカーが途中で止まった場合など）は取得失敗として残す
+        return {target_date: results.get(target_date) for target_date in dates}
+
+    @staticmethod
+    def find_candidate_dates(scan_results, class_names):
+        """スキャン結果から対象講座の日程がある日付を抽出する（取得失敗の日付も念のため含める）"""
+        candidate_dates = []
+        for target_date in sorted(scan_results):
+            sessions = scan_results[target_date]
+            if sessions is None or any(
+                any(class_name in text for class_name in class_names) for _, text in sessions
+            ):
+                candidate_dates.append(target_date)
+        return candidate_dates
+
+class ConflictChecker:
+    """追加予定の日程同士、および既存の日程との重複・時間帯の重なりを検出するヘルパークラス"""
+
+    @staticmethod
+    def to_minutes(time_str):
+        """'14:30' を 0時からの分数にする"""
+        hour, minute = map(int, time_str.split(':'))
+        return hour * 60 + minute
+
+    @staticmethod
+    def parse_listing_times(text):
+        """日程一覧のリンクテキストから (開始, 終了) の分数を取り出す（終了時刻がなければ開始から1分間とみなす）"""
+        times = re.findall(r'(\d{1,2}):(\d{2})', text)
+        if not times:
+            return None
+        start = int(times[0][0]) * 60 + int(times[0][1])
+        end = int(times[1][0]) * 60 + int(times[1][1]) if len(times) > 1 else start
+        return start, max(start + 1, end)
+
+    @staticmethod
+    def find_conflicts(new_slots, existing_slots):
+        """
+        new_slots: [(key, start, end)]、existing_slots: [(key, start, end)]（key は講座と日付、時刻は分数）
+        講座・日付ごとに区間を開始時刻順に並べて判定する（O(n log n)）。
+        戻り値は {new_slots のインデックス: 理由}。追加予定同士では開始時刻の早い日程（同じなら先に入力された日程）を残す。
+        """
+        # 既存の日程: 講座・日付ごとに開始時刻でソートし、終了時刻の累積最大値を持つ
+        existing_index = {}
+        for key, start, end in existing_slots:
+            existing_index.setdefault(key, []).append((start, end))
+        for key, intervals in existing_index.items():
+            intervals.sort()
+            starts = [start for start, _ in intervals]
+            max_ends = []
+            for _, end in intervals:
+                max_ends.append(max(end, max_ends[-1]) if max_ends else end)
+            existing_index[key] = (starts, max_ends)
+
+        conflicts = {}
+        remaining = {}
+        for index, (key, start, end) in enumerate(new_slots):
+            if key in existing_index:
+                starts, max_ends = existing_index[key]
+                # 開始時刻が新しい日程の終了より前の既存日程のうち、終了が最も遅いものと比較する
+                position = bisect.bisect_left(starts, max(end, start + 1))
+                if position > 0 and max_ends[position - 1] > start:
+                    conflicts[index] = "既存の日程と時間帯が重なっています"
+                    continue
+            remaining.setdefault(key, []).append((start, end, index))
+
+        # 追加予定同士: 開始時刻順に走査し、残した日程の終了時刻と比較する
+        for key, intervals in remaining.items():
+            intervals.sort(key=lambda interval: (interval[0], interval[2]))
+            kept = {}  # (start, end) -> 残した日程のインデックス
+            latest_end = None
+            for start, end, index in intervals:
+                if (start, end) in kept:
+                    conflicts[index] = "同じ日程が重複しています"
+                elif latest_end is not None and start < latest_end:
+                    conflicts[index] = "他の追加予定の日程と時間帯が重なっています"
+                else:
+                    kept[(start, end)] = index
+                    latest_end = end if latest_end is None else max(latest_end, end)
+        return conflicts
+
+    @staticmethod
+    def existing_slots_for(scan_results, names_by_key):
+        """
+        日程一覧のスキャン結果を、講座名でマッチさせて [(key, start, end)] にする。
+        names_by_key は {講座キー: 講座名}、キーは (講座キー, 日付) の組になる。
+        """
+        slots = []
+        for target_date, sessions in scan_results.items():
+            for _, text in sessions or []:
+                times = ConflictChecker.parse_listing_times(text)
+                if times is None:
+                    continue
+                for course_key, class_name in names_by_key.items():
+                    if class_name and class_name in text:
+                        slots.append(((course_key, target_date), times[0], times[1]))
+        return slots
+
+    @staticmethod
+    def fetch_course_names(urls, log_func):
+        """日程追加ページを取得して、URLごとの講座名（『』内）を返す（取得できなければ None）"""
+        names = {}
+
+        def worker():
+            # sync APIは同じスレッドで二重に起動できないため、専用のスレッドで取得する
+            with sync_playwright() as p:
+                request_context = p.request.new_context(storage_state=AUTH_FILE_PATH)
+                try:
+                    for url in urls:
+                        try:
+                            match = re.search(r'『(.+?)』', request_context.get(url, timeout=60000).text())
+                            names[url] = match.group(1).strip() if match else None
+                        except Exception as e:
+                            log_func(f"  - 講座名の取得に失敗しました ({url}): {e}")
+                            names[url] = None
+                finally:
+                    request_context.dispose()
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        thread.join()
+        return names
+
+    @staticmethod
+    def check_records(records, is_organizer, log_func, control=None, policy=CONFLICT_POLICY, scan_results=None,
+                      accepted_slots=None, owner=None):
+        """
+        個別日程追加の ScheduleRecord を、入力内の重複と既存日程との重なりについて確認する。
+        戻り値は (追加する日程のリスト, 除外した件数)。日付・時刻を解析できない行はそのまま残す。
+        scan_results（ScheduleScanner.scan_dates の結果）を渡すと、日程一覧を取得し直さずにそれを使う。
+        accepted_slots（{(講座ID, 日付): [(開始, 終了, owner)]}）を渡すと、同じ実行で先に追加対象にした日程とも
+        重なりを確認し、残した日程を owner として登録する（同じ owner の登録はリトライ時の再確認のため対象外）。
+        """
+        new_slots = []
+        slot_records = []
+        for record in records:
+            try:
+                target_date = date.fromisoformat(record.date)
+                start = ConflictChecker.to_minutes(record.start)
+                end = ConflictChecker.to_minutes(record.end)
+            except ValueError:
+                continue
+            new_slots.append(((record.classdetailid, target_date), start, end))
+            slot_records.append(record)
+
+        dates = sorted({key[1] for key, _, _ in new_slots})
+        if scan_results is None:
+            scan_results = ScheduleScanner.scan_dates(dates, is_organizer, log_func, control=control)
+        else:
+            scan_results = {target_date: scan_results.get(target_date) for target_date in dates}
+        names_by_key = {record.classdetailid: record.class_name for record in slot_records}
+        existing_slots = ConflictChecker.existing_slots_for(scan_results, names_by_key)
+
+        conflicts = ConflictChecker.find_conflicts(new_slots, existing_slots)
+        if accepted_slots is not None:
+            earlier_slots = [
+                (key, start, end)
+                for key in {key for key, _, _ in new_slots}
+                for start, end, slot_owner in accepted_slots.get(key, [])
+                if slot_owner != owner
+            ]
+            for index in ConflictChecker.find_conflicts(new_slots, earlier_slots):
+                conflicts.setdefault(index, "同じ実行で先に追加する日程と重複・重なりがあります")
+        ConflictChecker.log_conflicts(
+            conflicts,
+            lambda i: f"{slot_records[i].date} {slot_records[i].start}~{slot_records[i].end} {slot_records[i].class_name}",
+            log_func,
+            policy,
+        )
+        dropped = {id(slot_records[i]) for i in conflicts} if policy == "skip" else set()
+        if accepted_slots is not None:
+            for (key, start, end), record in zip(new_slots, slot_records):
+                if id(record) not in dropped:
+                    slots = accepted_slots.setdefault(key, [])
+                    if (start, end, owner) not in slots:
+                        slots.append((start, end, owner))
+        if not dropped:
+            return list(records), 0
+        return [record for record in records if id(record) not in dropped], len(dropped)
+
+    @staticmethod
+    def log_conflicts(conflicts, describe_func, log_func, policy=CONFLICT_POLICY):
+        """検出した重なりをログに出力する"""
+        if not conflicts:
+            log_func("日程の重複・時間帯の重なりはありませんでした。")
+            return
+        action = "追加対象から除外します" if policy == "skip" else "警告のみでそのまま追加します"
+        log_func(f"[警告] 重複・時間帯の重なりが {len(conflicts)} 件見つかりました（{action}）", color="orange", weight=ft.FontWeight.BOLD)
+        for index in sorted(conflicts):
+            log_func(f"- {describe_func(index)}: {conflicts[index]}", color="orange")
+
 def do_login(page_instance: ft.Page, status_text: ft.Text):
     """ 認証情報ファイルを作成する処理 """
     def update_status(value, color):
@@ -352,8 +1871,8 @@ def do_login(page_instance: ft.Page, status_text: ft.Text):
     except Exception as e:
         update_status(f"ログインに失敗またはタイムアウトしました: {e}", "red")
 
-def run_playwright_task(page_instance: ft.Page, log_column: ft.Column, task_func, *args):
-    """Playwrightタスクを別スレッドで実行するための共通ラッパー"""
+def run_playwright_task(page_instance: ft.Page, log_column: ft.Column, task_func, *args, control=None):
+    """Playwrightタスクを別スレッドで実行するための共通ラッパー（control で停止・一時停止を伝える）"""
     def log(message, color="black", weight=ft.FontWeight.NORMAL):
         log_column.controls.append(
             ft.Text(message, color=color, weight=weight, selectable=True, font_family="monospace", size=12)
@@ -364,12 +1883,12 @@ def run_playwright_task(page_instance: ft.Page, log_column: ft.Column, task_func
     page_instance.update()
 
     try:
-        task_func(log, page_instance, *args)
+        task_func(log, page_instance, *args, control=control)
     except Exception as e:
         log(f"予期せぬエラーが発生しました: {e}")
         print(f"エラー詳細: {e}")
 
-def add_schedules_logic(log, page_instance, schedules_text):
+def add_schedules_logic(log, page_instance, schedules_text, is_organizer=IS_ORGANIZER, control=None):
     """個別日程で日程を追加するロジック"""
     log("個別日程による日程追加を開始します...")
     schedules = ScheduleHelper.parse_custom_schedules(schedules_text)
@@ -379,111 +1898,74 @@ def add_schedules_logic(log, page_instance, schedules_text):
     
     log(f"処理対象の日程数: {len(schedules)}")
     skipped_schedules = []
-    
-    try:
-        playwright, browser, context = PlaywrightHelper.create_browser_context()
-        page = context.new_page()
-        
-        for schedule_index, (class_name_from_tsv, classdetailid, date_str, start_str, end_str, capacity_str, price_str, deadline_str, contact_str) in enumerate(schedules, 1):
-            url = f"https://www.street-academy.com/session_details/new_multi_session?classdetailid={classdetailid}"
-            log(f"\n--- 日程 {schedule_index}/{len(schedules)}: {date_str} {start_str}~{end_str} (講座ID: {classdetailid}) を追加します ---")
-            page.goto(url)
-            expect(page.get_by_role("button", name="日程を複製する")).to_be_visible(timeout=30000)
 
-            # 講座名のチェック
-            try:
-                page_title_element = page.locator('p:has-text("『")')
-                expect(page_title_element).to_be_visible(timeout=10000)
-                class_name_on_page = page_title_element.inner_text().replace('『', '').replace('』', '').strip()
-                
-                if class_name_from_tsv != class_name_on_page:
-                    log(f"[警告] 講座名が一致しません。スキップします。")
-                    log(f"  - 入力した講座名: {class_name_from_tsv}")
-                    log(f"  - 日程追加画面の講座名: {class_name_on_page}")
-                    skipped_schedules.append({
-                        'date': date_str,
-                        'tsv_name': class_name_from_tsv,
-                        'page_name': class_name_on_page
-                    })
-                    continue
-                else:
-                    log("講座名の一致を確認しました。")
-            except Exception as e:
-                log(f"[エラー] 講座名のチェック中にエラーが発生しました: {e} スキップします。")
+    def describe(item):
+        schedule_index, schedule = item
+        return f"日程 {schedule_index}/{len(schedules)}: {schedule[2]} {schedule[3]}~{schedule[4]} (講座ID: {schedule[1]})"
+
+    def prepare_one(item, page):
+        """1件の日程のフォームを開いて入力する（講座名が一致しなければ False）"""
+        schedule_index, record = item
+        class_name_from_tsv, classdetailid, date_str, start_str, end_str = record[:5]
+        log(f"\n--- 日程 {schedule_index}/{len(schedules)}: {date_str} {start_str}~{end_str} (講座ID: {classdetailid}) を追加します ---")
+        page = ScheduleSubmitter.open_form(session, classdetailid, log, page=page)
+
+        # 講座名のチェック
+        try:
+            page_title_element = page.locator('p:has-text("『")')
+            expect(page_title_element).to_be_visible(timeout=10000)
+            class_name_on_page = page_title_element.inner_text().replace('『', '').replace('』', '').strip()
+            
+            if class_name_from_tsv != class_name_on_page:
+                log(f"[警告] 講座名が一致しません。スキップします。")
+                log(f"  - 入力した講座名: {class_name_from_tsv}")
+                log(f"  - 日程追加画面の講座名: {class_name_on_page}")
                 skipped_schedules.append({
                     'date': date_str,
                     'tsv_name': class_name_from_tsv,
-                    'page_name': '取得失敗'
+                    'page_name': class_name_on_page
                 })
-                continue
+                return False
+            else:
+                log("講座名の一致を確認しました。")
+        except Exception as e:
+            log(f"[エラー] 講座名のチェック中にエラーが発生しました: {e} スキップします。")
+            skipped_schedules.append({
+                'date': date_str,
+                'tsv_name': class_name_from_tsv,
+                'page_name': '取得失敗'
+            })
+            return False
 
-            # オンライン選択肢があれば選択
-            online_radio_button = page.locator("#session_detail_multi_form_is_online_true")
-            if online_radio_button.is_visible():
-                log("開催形式の選択肢を検出。「オンライン」を選択します。")
-                online_radio_button.check()
-                expect(online_radio_button).to_be_checked()
-                log("「オンライン」を選択しました。")
+        # フォームの全項目を1回のページ内スクリプトで入力し、結果もまとめて検証する
+        if not FormFiller.fill(page, record, log):
+            log("一括入力の検証に失敗したため、項目ごとの入力に切り替えます。")
+            FormFiller.fill_with_locators(page, record, log)
 
-            # 定員を設定 (日程より前に設定)
-            page.locator("#session_detail_multi_form_session_capacity").fill(capacity_str)
-            log(f"定員を {capacity_str} に設定しました。")
-
-            first_block = page.locator('div[data-repeater-item]').first
-            y, m, d = map(int, date_str.split('-'))
-            first_block.locator('select[name*="[session_startdate_year]"]').select_option(str(y))
-            first_block.locator('select[name*="[session_startdate_month]"]').select_option(str(m))
-            first_block.locator('select[name*="[session_startdate_day]"]').select_option(str(d))
-            start_hour, start_min = map(int, start_str.split(':'))
-            end_hour, end_min = map(int, end_str.split(':'))
-            first_block.locator('select.js_start_time_hour').select_option(str(start_hour))
-            first_block.locator('select.js_start_time_minute').select_option(str(start_min))
-            first_block.locator('select.js_end_time_hour').select_option(str(end_hour))
-            first_block.locator('select.js_end_time_minute').select_option(str(end_min))
-            log(f"{start_hour:02d}:{start_min:02d} - {end_hour:02d}:{end_min:02d} の日程を設定しました。")
-
-            # 締め切り日時を設定
-            try:
-                if '日前' in deadline_str:
-                    value = deadline_str.replace('日前', '').strip()
-                    page.locator("#session_detail_multi_form_select_deadline_type_0").check()
-                    page.locator("#session_detail_multi_form_deadline_days_ago").fill(value)
-                    log(f"締め切りを {value} 日前に設定しました。")
-                elif '時間前' in deadline_str:
-                    value = deadline_str.replace('時間前', '').strip()
-                    page.locator("#session_detail_multi_form_select_deadline_type_1").check()
-                    page.locator("#session_detail_multi_form_deadline_hours_ago").fill(value)
-                    log(f"締め切りを {value} 時間前に設定しました。")
-                elif '分前' in deadline_str:
-                    value = deadline_str.replace('分前', '').strip()
-                    page.locator("#session_detail_multi_form_select_deadline_type_2").check()
-                    page.locator("#session_detail_multi_form_deadline_minutes_ago").fill(value)
-                    log(f"締め切りを {value} 分前に設定しました。")
-                else:
-                    log(f"警告: 解析できない締め切りフォーマットです: {deadline_str}")
-            except Exception as e:
-                log(f"締め切り日時の設定中にエラーが発生しました: {e}")
+        time.sleep(1)
+        return True
 
-            # 受講料を設定
-            page.locator("#session_detail_multi_form_cost").fill(price_str)
-            log(f"受講料を {price_str} 円に設定しました。")
+    def add_one(item):
+        """1件の日程を確定して完了を待つ（待つ間に次の日程を先読みする。成功で True、スキップで False）"""
+        if not pipeline.submit(item):
+            return False
+        schedule_index, record = item
+        log(f"--- 日程 {schedule_index}/{len(schedules)}: {record.date} {record.start}~{record.end} の日程追加が完了しました！ ---")
+        time.sleep(3)
+        return True
+    
+    try:
+        # 送信する前に、入力内の重複と既存の日程との時間帯の重なりを確認する
+        log("追加予定の日程の重複・既存日程との重なりを確認しています...")
+        schedules, conflict_count = ConflictChecker.check_records(schedules, is_organizer, log, control=control)
 
-            # 緊急連絡先を設定
-            page.locator("#session_detail_multi_form_emergency_contact").fill(contact_str)
-            log(f"緊急連絡先を {contact_str} に設定しました。")
+        session = BrowserSession(log, control=control)
+        pipeline = SubmitPipeline(session, prepare_one, describe, log)
 
-            time.sleep(1)
-            page.get_by_role("button", name="プレビュー画面で確認").click()
-            confirm_button = page.get_by_role("button", name="確定")
-            expect(confirm_button).to_be_visible(timeout=15000)
-            time.sleep(1)
-            confirm_button.click()
-            log("完了ページへの遷移を待っています...")
-            button1 = page.get_by_role("link", name="集客する")
-            button2 = page.get_by_role("link", name="日程追加")
-            expect(button1.or_(button2).first).to_be_visible(timeout=20000)
-            log(f"--- 日程 {schedule_index}/{len(schedules)}: {date_str} {start_str}~{end_str} の日程追加が完了しました！ ---")
-            time.sleep(3)
+        # 日程ごとにエラーを分離し、一時的なエラーは最後にまとめてリトライする
+        result = RetryHelper.run_with_retry_queue(list(enumerate(schedules, 1)), add_one, describe, log,
+                                                  control=control, peek_func=pipeline.peek)
+        result['skipped'] += conflict_count
 
         # 最後にスキップされた日程のサマリーをログに出力
         if skipped_schedules:
@@ -495,85 +1977,131 @@ def add_schedules_logic(log, page_instance, schedules_text):
             log("詳細は上記ログをご確認ください。", color="red", weight=ft.FontWeight.BOLD)
             log("="*50, color="red", weight=ft.FontWeight.BOLD)
 
+        RetryHelper.log_summary(result, describe, log)
+
+    except JobCancelled as e:
+        log(str(e), color="orange", weight=ft.FontWeight.BOLD)
     except Exception as e:
         log(f"エラーが発生しました: {e}")
     finally:
-        if 'browser' in locals():
-            browser.close()
+        if 'session' in locals():
+            session.close()
         log("\nすべての処理が完了しました。")
 
-def add_continuous_schedules_logic(log, page_instance, urls, contact, start_str, end_str):
-    """ 連続日程追加のロジック """
+def add_continuous_schedules_logic(log, page_instance, urls, contact, start_str, end_str, is_organizer=IS_ORGANIZER, rule_text='', control=None):
+    """ 連続日程追加のロジック（繰り返しルールを少しずつ展開し、まとめて送信する） """
     log("連続日程追加処理を開始します...")
     start_date = date.fromisoformat(start_str)
     end_date = date.fromisoformat(end_str)
     
-    # URLを改行区切りで分割
-    url_list = [url.strip() for url in urls.strip().split('\n') if url.strip()]
+    # URLを改行区切りで分割（URLの後ろにタブ・スペース区切りで講座ごとの枠の長さ(分)を指定できる）
+    url_list = []
+    for line in urls.strip().split('\n'):
+        parts = line.split()
+        if not parts:
+            continue
+        match = re.search(r'classdetailid=(\d+)', parts[0])
+        if not match:
+            log(f"エラー: URLから講座IDを読み取れません: {parts[0]}")
+            return
+        slot_minutes = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        url_list.append((parts[0], match.group(1), slot_minutes))
     if not url_list:
         log("エラー: 有効なURLが入力されていません。")
         return
+
+    try:
+        rule = RecurrenceHelper.parse_rule(rule_text)
+        for url, _, slot_minutes in url_list:
+            if slot_minutes:
+                RecurrenceHelper.validate(rule, slot_minutes)
+    except ValueError as e:
+        log(f"エラー: 繰り返しルールを解析できません: {e}")
+        return
     
     log(f"処理対象のURL数: {len(url_list)}")
+
+    def describe(item):
+        _, batch = item
+        return f"講座ID {batch[0].classdetailid}: {batch[0].date} {batch[0].start} 〜 {batch[-1].date} {batch[-1].start} ({len(batch)} 件)"
+
+    def generate_batches(course_names):
+        """URLごとにルールを展開し、送信単位のまとまりを1つずつ返す"""
+        for url, classdetailid, slot_minutes in url_list:
+            records = (
+                ScheduleRecord(
+                    course_names.get(url) or '',
+                    classdetailid,
+                    single_date.isoformat(),
+                    ScheduleCloner.minutes_to_time(start),
+                    ScheduleCloner.minutes_to_time(end),
+                    None,
+                    None,
+                    None,
+                    contact,
+                )
+                for single_date, start, end in RecurrenceHelper.expand(rule, start_date, end_date, slot_minutes)
+            )
+            yield from RecurrenceHelper.batched(records)
+
+    def prepare_batch(item, page):
+        """1回のフォーム送信分の日程を、重複・既存日程・先に追加する日程との重なりを確認してからフォームに入力する"""
+        index, batch = item
+        log(f"\n--- {describe(item)} を追加します ---")
+        records, conflict_count = ConflictChecker.check_records(
+            batch, is_organizer, log, control=control, scan_results=scan_results,
+            accepted_slots=accepted_slots, owner=index,
+        )
+        # 処理中（先読みを含めて最大2件）のまとまりの件数だけを保持し、完了したら合計に加える
+        pending_counts[index] = (conflict_count, len(records))
+        if not records:
+            log("追加する日程がないためスキップします。")
+            return False
+        ScheduleSubmitter.prepare_batch(session, records, log, page=page)
+        return True
+
+    def add_batch(item):
+        """フォームを確定して完了を待つ（待つ間に次のまとまりを先読みする）"""
+        nonlocal conflict_total
+        submitted = pipeline.submit(item)
+        conflict_count, added_count = pending_counts.pop(item[0], (0, 0))
+        conflict_total += conflict_count
+        if not submitted:
+            return False
+        log(f"--- {describe(item)}: {added_count} 件の日程追加が完了しました！ ---")
+        time.sleep(3)
+        return True
     
     try:
-        playwright, browser, context = PlaywrightHelper.create_browser_context()
-        page = context.new_page()
-
-        for url_index, url in enumerate(url_list, 1):
-            log(f"\n=== URL {url_index}/{len(url_list)}: {url} ===")
-            for single_date in daterange(start_date, end_date):
-                log(f"\n--- {single_date.strftime('%Y-%m-%d')} の日程を追加します ---")
-                page.goto(url)
-                expect(page.get_by_role("button", name="日程を複製する")).to_be_visible(timeout=30000)
-
-                # 「オンライン」のラジオボタンを選択
-                online_radio_button = page.locator("#is_online_check")
-                if online_radio_button.is_visible():
-                    log("開催形式の選択肢を検出。「オンライン」を選択します。")
-                    online_radio_button.check()
-                    expect(online_radio_button).to_be_checked()
-                    log("「オンライン」を選択しました。")
-                
-                first_block = page.locator('div[data-repeater-item]').first
-                first_block.locator('select[name*="[session_startdate_year]"]').select_option(str(single_date.year))
-                first_block.locator('select[name*="[session_startdate_month]"]').select_option(str(single_date.month))
-                first_block.locator('select[name*="[session_startdate_day]"]').select_option(str(single_date.day))
-                first_block.locator('select.js_start_time_hour').select_option(str(HOURS_TO_ADD[0]))
-                first_block.locator('select.js_end_time_hour').select_option(str(HOURS_TO_ADD[0] + 1))
-                log(f"{HOURS_TO_ADD[0]}:00 - {HOURS_TO_ADD[0]+1}:00 の日程を設定しました。")
-
-                for hour in HOURS_TO_ADD[1:]:
-                    page.get_by_role("button", name="日程を複製する").click()
-                    last_block = page.locator('div[data-repeater-item]').last
-                    expect(last_block).to_be_visible()
-                    end_hour = hour + 1 if hour < 23 else 23
-                    last_block.locator('select.js_start_time_hour').select_option(str(hour))
-                    last_block.locator('select.js_end_time_hour').select_option(str(end_hour))
-                    log(f"{hour}:00 - {end_hour}:00 の日程を設定しました。")
-
-                page.locator("#session_detail_multi_form_emergency_contact").fill(contact)
-                page.get_by_role("button", name="プレビュー画面で確認").click()
-                confirm_button = page.get_by_role("button", name="確定")
-                expect(confirm_button).to_be_visible(timeout=15000)
-                confirm_button.click()
-                
-                log("完了ページへの遷移を待っています...")
-                button1 = page.get_by_role("link", name="集客する")
-                button2 = page.get_by_role("link", name="日程追加")
-                expect(button1.or_(button2).first).to_be_visible(timeout=20000)
-                
-                log(f"--- {single_date.strftime('%Y-%m-%d')} の日程追加が完了しました！ ---")
-                time.sleep(3)
+        course_names = ConflictChecker.fetch_course_names([url for url, _, _ in url_list], log)
+        # 既存の日程は期間全体を最初に1回だけスキャンし、各まとまりの確認に使い回す
+        log("既存の日程を確認しています...")
+        scan_results = ScheduleScanner.scan_dates(list(RecurrenceHelper.dates(rule, start_date, end_date)), is_organizer, log, control=control)
+        accepted_slots = {}
+        pending_counts = {}
+        conflict_total = 0
+
+        session = BrowserSession(log, control=control)
+        pipeline = SubmitPipeline(session, prepare_batch, describe, log)
+
+        # 日程はまとめて作らず、送信するたびに次のまとまりを展開する
+        result = RetryHelper.run_with_retry_queue(enumerate(generate_batches(course_names), 1), add_batch, describe, log,
+                                                  control=control, peek_func=pipeline.peek)
+        RetryHelper.log_summary(result, describe, log)
+        if conflict_total:
+            log(f"重複・既存日程との重なりのため除外した日程: {conflict_total} 件")
+    except JobCancelled as e:
+        log(str(e), color="orange", weight=ft.FontWeight.BOLD)
     except Exception as e:
         log(f"エラーが発生しました: {e}")
     finally:
-        if 'browser' in locals():
-            browser.close()
+        if 'session' in locals():
+            session.close()
         log("\nすべての処理が完了しました。")
 
-def delete_schedules_logic(log, page_instance, start_str, end_str, class_names_str, is_organizer):
+def delete_schedules_logic(log, page_instance, start_str, end_str, class_names_str, is_organizer, control=None):
     """ 連続日程削除のロジック """
+    control = control or JobControl()
     log("連続日程削除処理を開始します...")
     target_class_names = [name.strip() for name in class_names_str.strip().split('\n') if name.strip()]
     if not target_class_names:
@@ -585,33 +2113,54 @@ def delete_schedules_logic(log, page_instance, start_str, end_str, class_names_s
     end_date = date.fromisoformat(end_str)
 
     try:
-        playwright, browser, context = PlaywrightHelper.create_browser_context()
-        page = context.new_page()
+        # 先に日程一覧を並列スキャンし、対象講座の日程がある日付だけを削除対象にする
+        all_dates = list(daterange(start_date, end_date))
+        log(f"{len(all_dates)} 日分の日程一覧をスキャンしています...")
+        scan_results = ScheduleScanner.scan_dates(all_dates, is_organizer, log, control=control)
+        candidate_dates = ScheduleScanner.find_candidate_dates(scan_results, target_class_names)
+        log(f"削除対象の日程がある日付: {len(candidate_dates)} / {len(all_dates)} 日")
+        if not candidate_dates:
+            log("期間内に削除対象の講座はありませんでした。")
+            return
 
-        for single_date in daterange(start_date, end_date):
+        session = BrowserSession(log, control=control)
+        stats = {'deleted': 0, 'skipped': 0}
+        processed_count = 0
+
+        for single_date in candidate_dates:
+            control.checkpoint(log)
             log(f"\n--- {single_date.strftime('%Y-%m-%d')} の日程削除を開始します ---")
             date_param = URLHelper.format_date_param(single_date)
             base_url = URLHelper.build_schedule_url(date_param, is_organizer=is_organizer)
 
             # 共通化されたページング処理を使用
             log(f"アクセス中: {base_url}")
-            page.goto(base_url, timeout=60000)
-            if not PlaywrightHelper.handle_403_forbidden(page, log):
+            session.goto(base_url, timeout=60000)
+            page = session.page
+            if not PlaywrightHelper.handle_403_forbidden(page, log, control=control):
                 continue
 
-            found_any = ScheduleHelper.find_and_delete_schedules(page, log, target_class_names, None)
+            found_any = ScheduleHelper.find_and_delete_schedules(page, log, target_class_names, None, control=control, stats=stats)
+            processed_count += 1
             
             if not found_any:
                 log("この日付に削除対象の講座はありませんでした。")
+        ScheduleHelper.log_delete_summary(stats, 0, "日", log)
+    except JobCancelled as e:
+        log(str(e), color="orange", weight=ft.FontWeight.BOLD)
+        if 'stats' in locals():
+            # 途中で停止した日付も未処理として数える
+            ScheduleHelper.log_delete_summary(stats, len(candidate_dates) - processed_count, "日", log)
     except Exception as e:
         log(f"エラーが発生しました: {e}")
     finally:
-        if 'browser' in locals():
-            browser.close()
+        if 'session' in locals():
+            session.close()
         log("\nすべての処理が完了しました。")
 
-def delete_custom_schedules_logic(log, page_instance, schedules_text, class_names_str, is_organizer):
+def delete_custom_schedules_logic(log, page_instance, schedules_text, class_names_str, is_organizer, control=None):
     """個別日程で日程を削除するロジック"""
+    control = control or JobControl()
     log("個別日程による日程削除を開始します...")
     schedules = ScheduleHelper.parse_delete_schedules(schedules_text)
     if not schedules:
@@ -626,10 +2175,12 @@ def delete_custom_schedules_logic(log, page_instance, schedules_text, class_name
     log(f"削除対象の講座名: {', '.join(target_class_names)}")
 
     try:
-        playwright, browser, context = PlaywrightHelper.create_browser_context()
-        page = context.new_page()
+        session = BrowserSession(log, control=control)
+        stats = {'deleted': 0, 'skipped': 0}
+        processed_count = 0
 
         for schedule_index, (date_str, start_str) in enumerate(schedules, 1):
+            control.checkpoint(log)
             log(f"\n--- 日程 {schedule_index}/{len(schedules)}: {date_str} {start_str} を削除します ---")
             
             # 日付パラメータを作成
@@ -639,25 +2190,487 @@ def delete_custom_schedules_logic(log, page_instance, schedules_text, class_name
             
             # 共通化されたページング処理を使用
             log(f"アクセス中: {base_url}")
-            page.goto(base_url, timeout=60000)
-            if not PlaywrightHelper.handle_403_forbidden(page, log):
+            session.goto(base_url, timeout=60000)
+            page = session.page
+            if not PlaywrightHelper.handle_403_forbidden(page, log, control=control):
                 continue
 
-            found_schedule = ScheduleHelper.find_and_delete_schedules(page, log, target_class_names, start_str)
+            found_schedule = ScheduleHelper.find_and_delete_schedules(page, log, target_class_names, start_str, control=control, stats=stats)
+            processed_count += 1
             
             if not found_schedule:
                 log(f"講座名と開始時刻 {start_str} に一致する日程が見つかりませんでした。")
+        ScheduleHelper.log_delete_summary(stats, 0, "件", log)
+    except JobCancelled as e:
+        log(str(e), color="orange", weight=ft.FontWeight.BOLD)
+        if 'stats' in locals():
+            # 途中で停止した日程も未処理として数える
+            ScheduleHelper.log_delete_summary(stats, len(schedules) - processed_count, "件", log)
     except Exception as e:
         log(f"エラーが発生しました: {e}")
     finally:
-        if 'browser' in locals():
-            browser.close()
+        if 'session' in locals():
+            session.close()
+        log("\nすべての処理が完了しました。")
+
+def edit_schedules_logic(log, page_instance, edits_text, class_names_str, is_organizer=IS_ORGANIZER, control=None):
+    """既存の日程を編集ページで一括編集するロジック"""
+    log("日程の一括編集を開始します...")
+    edits = ScheduleHelper.parse_edit_schedules(edits_text)
+    if not edits:
+        log("有効な編集内容が入力されていません。\n例: 2025-08-27 14:00\t5\t3000\t1日前\t090-1234-5678")
+        return
+
+    target_class_names = [name.strip() for name in class_names_str.strip().split('\n') if name.strip()]
+    if any(edit.sessiondetailid is None for edit in edits) and not target_class_names:
+        log("エラー: 日付と開始時刻で指定する場合は、対象の講座名を入力してください。")
+        return
+
+    log(f"編集内容の行数: {len(edits)}")
+
+    def describe(item):
+        sessiondetailid, edit = item
+        target = f"sessiondetailid={sessiondetailid}" if sessiondetailid else "日程"
+        return f"{target} ({edit.date} {edit.start})" if edit.date else target
+
+    def edit_one(item):
+        """1件の日程を編集する（成功で True、変更不要でスキップした場合は False）"""
+        sessiondetailid, edit = item
+        changes = {'capacity': edit.capacity, 'price': edit.price, 'deadline': edit.deadline, 'contact': edit.contact}
+        log(f"\n--- {describe(item)} を編集します ---")
+        page, _ = ScheduleHelper.open_session_edit_page(session, sessiondetailid, is_organizer, log)
+
+        # 現在値と比べて、変更が必要な項目だけを反映する
+        current = FormFiller.edit_form_values(page)
+        differences = FormFiller.find_edit_differences(changes, current)
+        if not differences:
+            log("  - すべての項目が指定の値と同じため、スキップします。")
+            return False
+        log(f"  - 変更する項目: {', '.join(f'{key}: {current.get(key)} → {changes[key]}' for key in differences)}")
+        targets = {key: changes[key] for key in differences}
+        applied = FormFiller.edit_form_values(page, targets)
+        not_applied = FormFiller.find_edit_differences(targets, applied)
+        if not_applied:
+            raise Exception(f"編集フォームに反映できなかった項目があります: {', '.join(not_applied)}")
+
+        submit_url = page.url
+        page.get_by_role("button", name=re.compile(r"^(更新|保存|変更)(する)?$")).first.click()
+        # 確認画面が表示される場合は確定する
+        confirm_button = page.get_by_role("button", name="確定")
+        try:
+            expect(confirm_button).to_be_visible(timeout=5000)
+            submit_url = page.url
+            confirm_button.click()
+        except AssertionError:
+            pass
+        try:
+            page.wait_for_url(lambda url: url != submit_url, timeout=20000)
+        except PlaywrightTimeoutError:
+            # 同じURLに戻る・エラー付きでフォームが再表示される場合があるため、結果は保存後の値で判断する
+            pass
+        page.wait_for_load_state()
+        error_messages = page.evaluate(FormFiller.ERROR_MESSAGES_SCRIPT)
+
+        # 編集ページを開き直し、保存された値が指定どおりかを確認する
+        page, _ = ScheduleHelper.open_session_edit_page(session, sessiondetailid, is_organizer, log)
+        not_saved = FormFiller.find_edit_differences(targets, FormFiller.edit_form_values(page))
+        if not_saved:
+            detail = f"（画面のエラー: {' / '.join(error_messages)}）" if error_messages else ""
+            raise Exception(f"保存後の値が指定と異なります: {', '.join(not_saved)}{detail}")
+        log("  - 編集が完了しました！")
+        time.sleep(1)
+        return True
+
+    try:
+        # sessiondetailid で指定された日程はそのまま、日付と開始時刻の指定は日程一覧から探す
+        items = {}
+        not_found = []
+        for edit in edits:
+            if edit.sessiondetailid:
+                items[edit.sessiondetailid] = edit
+        selector_edits = [edit for edit in edits if not edit.sessiondetailid]
+        if selector_edits:
+            log("日程一覧から編集対象の日程を検索しています...")
+            dates = sorted({date.fromisoformat(edit.date) for edit in selector_edits})
+            scan_results = ScheduleScanner.scan_dates(dates, is_organizer, log, control=control)
+            for edit in selector_edits:
+                start_time = ScheduleHelper.extract_time_from_text(edit.start)
+                matched = [
+                    sessiondetailid
+                    for sessiondetailid, text in scan_results.get(date.fromisoformat(edit.date)) or []
+                    if sessiondetailid
+                    and any(class_name in text for class_name in target_class_names)
+                    and ScheduleHelper.extract_time_from_text(text) == start_time
+                ]
+                if not matched:
+                    log(f"[警告] 講座名と {edit.date} {edit.start} に一致する日程が見つかりませんでした。", color="orange")
+                    not_found.append(((None, edit), Exception("一致する日程が見つかりませんでした")))
+                for sessiondetailid in matched:
+                    items[sessiondetailid] = edit
+        log(f"編集対象の日程数: {len(items)}")
+
+        session = BrowserSession(log, control=control)
+
+        # 日程ごとにエラーを分離し、一時的なエラーは最後にまとめてリトライする
+        result = RetryHelper.run_with_retry_queue(list(items.items()), edit_one, describe, log, control=control)
+        result['failed'].extend(not_found)
+        RetryHelper.log_summary(result, describe, log)
+    except JobCancelled as e:
+        log(str(e), color="orange", weight=ft.FontWeight.BOLD)
+    except Exception as e:
+        log(f"エラーが発生しました: {e}")
+    finally:
+        if 'session' in locals():
+            session.close()
+        log("\nすべての処理が完了しました。")
+
+def clone_schedules_logic(log, page_instance, class_names_str, source_start_str, source_end_str, shift_weeks_str, target_start_str, is_organizer=IS_ORGANIZER, control=None):
+    """既存の日程を、指定した週数（または複製先の開始日）だけずらして複製するロジック"""
+    control = control or JobControl()
+    log("日程の複製を開始します...")
+    source_start = date.fromisoformat(source_start_str)
+    source_end = date.fromisoformat(source_end_str)
+    # サービスモードでは数値で渡される場合もあるため、文字列にしてから判定する
+    target_start_str = str(target_start_str or '').strip()
+    shift_weeks_str = str(shift_weeks_str or '').strip()
+    if target_start_str:
+        shift = date.fromisoformat(target_start_str) - source_start
+    elif shift_weeks_str:
+        shift = timedelta(weeks=int(shift_weeks_str))
+    else:
+        log("エラー: 何週間後に複製するか、または複製先の開始日を入力してください。")
+        return
+    if shift.days == 0:
+        log("エラー: 複製元と複製先が同じ日付です。")
+        return
+
+    # 講座名が空の場合は期間内のすべての日程を複製する
+    target_class_names = [name.strip() for name in (class_names_str or '').strip().split('\n') if name.strip()]
+    log(f"複製元: {source_start} 〜 {source_end} / 複製先: {source_start + shift} 〜 {source_end + shift}（{shift.days} 日後）")
+
+    def describe(batch):
+        return f"講座ID {batch[0].classdetailid}: {len(batch)} 件 ({batch[0].date} {batch[0].start} 〜 {batch[-1].date} {batch[-1].start})"
+
+    try:
+        log("複製元の日程一覧を取得しています...")
+        scan_results = ScheduleScanner.scan_dates(list(daterange(source_start, source_end)), is_organizer, log, control=control)
+        sources = [
+            (source_date, sessiondetailid, text)
+            for source_date in sorted(scan_results)
+            for sessiondetailid, text in scan_results[source_date] or []
+            if sessiondetailid and (not target_class_names or any(class_name in text for class_name in target_class_names))
+        ]
+        log(f"複製元の日程数: {len(sources)}")
+        if not sources:
+            log("複製する日程がありませんでした。")
+            return
+
+        session = BrowserSession(log, control=control)
+
+        # 複製元の設定を読み取り、日付をずらした ScheduleRecord にする
+        records = []
+        for source_index, (source_date, sessiondetailid, text) in enumerate(sources, 1):
+            control.checkpoint(log)
+            try:
+                record = ScheduleCloner.read_source(session, sessiondetailid, text, source_date, is_organizer, log)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                log(f"[エラー] 複製元 sessiondetailid={sessiondetailid} の読み取りに失敗しました: {e}", color="red")
+                continue
+            records.append(record._replace(date=(source_date + shift).isoformat()))
+            log(f"  - 複製元 {source_index}/{len(sources)}: {source_date} {record.start}~{record.end} {record.class_name} → {records[-1].date}")
+
+        # 複製先に同じ日程がすでにある場合は除外する
+        log("複製先の日程の重複・既存日程との重なりを確認しています...")
+        records, conflict_count = ConflictChecker.check_records(records, is_organizer, log, control=control)
+
+        batches = ScheduleSubmitter.group_batches(records)
+        log(f"複製する日程数: {len(records)}（{len(batches)} 回に分けて送信します）")
+        result = RetryHelper.run_with_retry_queue(
+            batches, lambda batch: ScheduleSubmitter.submit_batch(session, batch, log), describe, log, control=control
+        )
+        RetryHelper.log_summary(result, describe, log)
+        if conflict_count:
+            log(f"重複のため除外した日程: {conflict_count} 件")
+    except JobCancelled as e:
+        log(str(e), color="orange", weight=ft.FontWeight.BOLD)
+    except Exception as e:
+        log(f"エラーが発生しました: {e}")
+    finally:
+        if 'session' in locals():
+            session.close()
         log("\nすべての処理が完了しました。")
 
 def daterange(start_date, end_date):
     for n in range(int((end_date - start_date).days) + 1):
         yield start_date + timedelta(n)
 
+class ServiceJob:
+    """サービスモードで受け付けた1件のジョブ（状態とログを保持する）"""
+
+    def __init__(self, job_type, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.job_type = job_type
+        self.params = params
+        self.status = "queued"  # queued / running / done / cancelled
+        self.control = JobControl()
+        self.logs = []
+        self.log_offset = 0  # 保持上限を超えて削除したログの行数
+        self.created_at = time.time()
+        self.finished_at = None
+        self._condition = threading.Condition()
+
+    def log(self, message, color="black", weight=None):
+        """*_logic から呼ばれるログ関数（ログを保持し、待機中のクライアントに通知する）"""
+        with self._condition:
+            self.logs.append({'message': message, 'color': color})
+            if len(self.logs) > SERVICE_MAX_LOG_LINES:
+                dropped = len(self.logs) - SERVICE_MAX_LOG_LINES
+                del self.logs[:dropped]
+                self.log_offset += dropped
+            self._condition.notify_all()
+
+    def set_status(self, status):
+        with self._condition:
+            self.status = status
+            if status in ("done", "cancelled"):
+                self.finished_at = time.time()
+            self._condition.notify_all()
+
+    def wait_for_logs(self, since, timeout):
+        """
+        since 行目以降のログが出るか、ジョブが終わるまで最大 timeout 秒待機する。
+        行番号はジョブ開始からの通し番号で、保持上限を超えて削除された行は返さない。
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.log_offset + len(self.logs) > since or self.status in ("done", "cancelled"),
+                timeout=timeout,
+            )
+            return self.logs[max(since - self.log_offset, 0):], self.log_offset + len(self.logs)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.job_type,
+            'status': self.status,
+            'paused': self.control.is_paused,
+            'log_count': self.log_offset + len(self.logs),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+class JobService:
+    """ジョブの受付・実行と、常駐ブラウザを持つワーカースレッドを管理する"""
+
+    # ジョブ種別ごとの (実行する関数, 受け付けるパラメータ名)。入力形式は画面と同じ
+    JOB_TYPES = {
+        'add': (add_schedules_logic, ['schedules_text', 'is_organizer']),
+        'continuous_add': (add_continuous_schedules_logic, ['urls', 'contact', 'start_date', 'end_date', 'is_organizer', 'rule']),
+        'delete': (delete_schedules_logic, ['start_date', 'end_date', 'class_names', 'is_organizer']),
+        'delete_custom': (delete_custom_schedules_logic, ['schedules_text', 'class_names', 'is_organizer']),
+        'edit': (edit_schedules_logic, ['edits_text', 'class_names', 'is_organizer']),
+        'clone': (clone_schedules_logic, ['class_names', 'source_start_date', 'source_end_date', 'shift_weeks', 'target_start_date', 'is_organizer']),
+    }
+
+    # 省略できるパラメータ（is_organizer はすべてのジョブで省略可能）
+    OPTIONAL_PARAMS = {
+        'continuous_add': {'rule'},
+        'edit': {'class_names'},
+        'clone': {'class_names', 'shift_weeks', 'target_start_date'},
+    }
+
+    def __init__(self, workers=SERVICE_WORKERS, headless=SERVICE_HEADLESS):
+        self.workers = workers
+        self.headless = headless
+        self.jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._queue = queue.Queue()
+
+    def start(self):
+        for index in range(self.workers):
+            threading.Thread(target=self._worker, args=(f"worker-{index + 1}",), daemon=True).start()
+
+    def submit(self, job_type, params):
+        """ジョブを登録してキューに入れる（パラメータが不正なら ValueError）"""
+        if job_type not in self.JOB_TYPES:
+            raise ValueError(f"不明なジョブ種別です: {job_type}（{', '.join(self.JOB_TYPES)}）")
+        _, param_names = self.JOB_TYPES[job_type]
+        optional = self.OPTIONAL_PARAMS.get(job_type, set()) | {'is_organizer'}
+        missing = [name for name in param_names if name not in optional and not params.get(name)]
+        if missing:
+            raise ValueError(f"必須パラメータがありません: {', '.join(missing)}")
+        job = ServiceJob(job_type, {name: params.get(name, IS_ORGANIZER if name == 'is_organizer' else '') for name in param_names})
+        with self._jobs_lock:
+            self._prune_finished_jobs()
+            self.jobs[job.id] = job
+        self._queue.put(job)
+        return job
+
+    def _prune_finished_jobs(self):
+        """終了済みのジョブが保持上限を超えていれば、終了の古いものから削除する（_jobs_lock の中で呼ぶ）"""
+        finished = sorted(
+            (job for job in self.jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at,
+        )
+        for job in finished[:max(0, len(finished) - SERVICE_MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id):
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self._jobs_lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def _worker(self, worker_name):
+        """常駐ブラウザを起動し、キューのジョブを順に実行する"""
+        with sync_playwright() as p:
+            browser = None
+            while True:
+                job = self._queue.get()
+                if job.control.is_stopped:
+                    job.set_status("cancelled")
+                    continue
+                job.set_status("running")
+                job.log(f"[{worker_name}] ジョブ {job.id} ({job.job_type}) を開始します")
+                task_func, param_names = self.JOB_TYPES[job.job_type]
+                try:
+                    # ブラウザは初回（または落ちていた場合）だけ起動し、以降のジョブで使い回す
+                    if browser is None or not browser.is_connected():
+                        browser = p.chromium.launch(headless=self.headless)
+                        BrowserPool.register(p, browser, worker_name)
+                    task_func(job.log, None, *[job.params[name] for name in param_names], control=job.control)
+                except Exception as e:
+                    job.log(f"予期せぬエラーが発生しました: {e}", color="red")
+                job.set_status("cancelled" if job.control.is_stopped else "done")
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    ローカルHTTP APIのリクエストハンドラ
+      POST /jobs                       ジョブ登録 {"type": "add", "schedules_text": "...", ...}
+      GET  /jobs                       ジョブ一覧
+      GET  /jobs/<id>                  ジョブの状態
+      GET  /jobs/<id>/logs?since=N&wait=秒   N行目以降のログ（wait 秒まで新しいログを待つ）
+      POST /jobs/<id>/cancel|pause|resume   停止・一時停止・再開
+    すべてのリクエストに起動時に表示されるトークンのヘッダーが必要。
+    ブラウザ上の他のサイトからの操作を防ぐため、Origin 付きのリクエストと JSON 以外の POST は受け付けない。
+    """
+
+    service = None  # run_service で JobService を設定する
+    token = None  # run_service で発行したトークンを設定する
+
+    def _authorize(self, require_json=False):
+        """トークンとリクエストの出どころを確認する（不正ならエラーを返して False）"""
+        if self.headers.get('Origin'):
+            self._send_json(403, {'error': 'ブラウザからのリクエストは受け付けていません。'})
+            return False
+        # ヘッダーに ASCII 以外の文字が含まれていても TypeError にならないよう、バイト列で比較する
+        sent_token = self.headers.get(SERVICE_TOKEN_HEADER, '').encode('utf-8', 'surrogateescape')
+        if not hmac.compare_digest(sent_token, (self.token or '').encode('utf-8')):
+            self._send_json(401, {'error': f'{SERVICE_TOKEN_HEADER} ヘッダーに起動時に表示されたトークンを指定してください。'})
+            return False
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if require_json and content_type != 'application/json':
+            self._send_json(415, {'error': 'Content-Type は application/json で送信してください。'})
+            return False
+        return True
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self):
+        parts = [part for part in urlparse(self.path).path.split('/') if part]
+        if not parts or parts[0] != 'jobs':
+            return None, None
+        job = None
+        if len(parts) > 1:
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send_json(404, {'error': 'ジョブが見つかりません。'})
+                return parts, False
+        return parts, job
+
+    def do_GET(self):
+        if not self._authorize():
+            return
+        parts, job = self._route()
+        if parts is None:
+            self._send_json(404, {'error': 'Not Found'})
+        elif job is False:
+            return
+        elif len(parts) == 1:
+            self._send_json(200, {'jobs': self.service.list()})
+        elif len(parts) == 2:
+            self._send_json(200, job.to_dict())
+        elif len(parts) == 3 and parts[2] == 'logs':
+            query = parse_qs(urlparse(self.path).query)
+            try:
+                since = max(int(query.get('since', ['0'])[0]), 0)
+                wait = float(query.get('wait', ['0'])[0])
+                if not math.isfinite(wait):
+                    raise ValueError(wait)
+            except ValueError:
+                self._send_json(400, {'error': 'since / wait は数値で指定してください。'})
+                return
+            wait = min(max(wait, 0), 60)
+            lines, next_index = job.wait_for_logs(since, wait)
+            self._send_json(200, {'lines': lines, 'next': next_index, 'status': job.status})
+        else:
+            self._send_json(404, {'error': 'Not Found'})
+
+    def do_POST(self):
+        if not self._authorize(require_json=True):
+            return
+        parts, job = self._route()
+        if parts is None:
+            self._send_json(404, {'error': 'Not Found'})
+        elif job is False:
+            return
+        elif len(parts) == 1:
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                params = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+                job = self.service.submit(params.get('type'), params)
+            except (ValueError, AttributeError) as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            self._send_json(202, job.to_dict())
+        elif len(parts) == 3 and parts[2] in ('cancel', 'pause', 'resume'):
+            {'cancel': job.control.stop, 'pause': job.control.pause, 'resume': job.control.resume}[parts[2]]()
+            if parts[2] == 'cancel' and job.status == "queued":
+                job.set_status("cancelled")
+            self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {'error': 'Not Found'})
+
+    def log_message(self, format, *args):
+        # アクセスログは出力しない
+        pass
+
+def run_service(host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS, token=None):
+    """画面を表示せずにローカルHTTP APIとしてジョブを受け付ける（token 省略時は起動ごとに発行する）"""
+    service = JobService(workers=workers)
+    service.start()
+    ServiceRequestHandler.service = service
+    ServiceRequestHandler.token = token or secrets.token_urlsafe(24)
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    print(f"サービスモードで起動しました: http://{host}:{port}/jobs （常駐ブラウザ: {workers}）")
+    print(f"リクエストには次のヘッダーを付けてください: {SERVICE_TOKEN_HEADER}: {ServiceRequestHandler.token}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
 def main(page: ft.Page):
     page.title = "ストアカ日程自動化ツール"
     page.vertical_alignment = ft.MainAxisAlignment.START
@@ -683,6 +2696,44 @@ def main(page: ft.Page):
     
     login_button = ft.ElevatedButton("ログイン / 認証情報を作成 (初回のみ)", on_click=handle_login)
 
+    # --- 実行中ジョブの停止・一時停止 ---
+    active_controls = []
+    pause_button = ft.ElevatedButton("一時停止", disabled=True)
+    stop_button = ft.ElevatedButton("停止", bgcolor="grey", color="white", disabled=True)
+
+    def update_job_buttons():
+        running = bool(active_controls)
+        pause_button.disabled = not running
+        stop_button.disabled = not running
+        pause_button.text = "再開" if running and all(c.is_paused for c in active_controls) else "一時停止"
+        page.update()
+
+    def register_control(control):
+        active_controls.append(control)
+        update_job_buttons()
+
+    def unregister_control(control):
+        if control in active_controls:
+            active_controls.remove(control)
+        update_job_buttons()
+
+    def handle_pause(e):
+        if pause_button.text == "再開":
+            for control in active_controls:
+                control.resume()
+        else:
+            for control in active_controls:
+                control.pause()
+        update_job_buttons()
+    pause_button.on_click = handle_pause
+
+    def handle_stop(e):
+        # 実行中の日程（送信中のフォームや削除処理）は最後まで完了させてから停止する
+        for control in active_controls:
+            control.stop()
+        update_job_buttons()
+    stop_button.on_click = handle_stop
+
 
     # --- 日程追加方式の選択ラジオボタン ---
     add_mode = ft.RadioGroup(
@@ -705,6 +2756,14 @@ def main(page: ft.Page):
     contact_input = ft.TextField(label="緊急連絡先", value=EMERGENCY_CONTACT, width=300)
     add_start_date = ft.TextField(label="開始日 (YYYY-MM-DD)", width=200)
     add_end_date = ft.TextField(label="終了日 (YYYY-MM-DD)", width=200)
+    rule_input = ft.TextField(
+        label="繰り返しルール (空欄の場合は毎日・HOURS_TO_ADD の時間帯)",
+        multiline=True,
+        min_lines=3,
+        width=600,
+        hint_text="例:\n曜日: 月,水,金\n時間: 8-22\n土: 10,13\n除外: 2025-09-15\n枠: 60",
+        hint_style=ft.TextStyle(color="#bbbbbb")
+    )
     add_button = ft.ElevatedButton("連続日程追加", bgcolor="blue", color="white")
 
     # --- 個別日程追加用UI ---
@@ -731,10 +2790,13 @@ def main(page: ft.Page):
         if add_running['value']:
             return
         set_add_running(True)
+        control = JobControl()
+        register_control(control)
         def wrapped():
             try:
-                run_playwright_task(page, log_column, add_continuous_schedules_logic, url_input.value, contact_input.value, add_start_date.value, add_end_date.value)
+                run_playwright_task(page, log_column, add_continuous_schedules_logic, url_input.value, contact_input.value, add_start_date.value, add_end_date.value, (org_mode.value == "organizer"), rule_input.value, control=control)
             finally:
+                unregister_control(control)
                 set_add_running(False)
         run_in_thread(wrapped)
     add_button.on_click = handle_add_schedules
@@ -743,10 +2805,13 @@ def main(page: ft.Page):
         if add_running['value']:
             return
         set_add_running(True)
+        control = JobControl()
+        register_control(control)
         def wrapped():
             try:
-                run_playwright_task(page, log_column, add_schedules_logic, custom_schedules_input.value)
+                run_playwright_task(page, log_column, add_schedules_logic, custom_schedules_input.value, (org_mode.value == "organizer"), control=control)
             finally:
+                unregister_control(control)
                 set_add_running(False)
         run_in_thread(wrapped)
     add_custom_button.on_click = handle_add_custom_schedules
@@ -756,6 +2821,7 @@ def main(page: ft.Page):
         url_input,
         contact_input,
         ft.Row([add_start_date, add_end_date]),
+        rule_input,
         add_button
     ])
     custom_add_form = ft.Column([
@@ -830,6 +2896,8 @@ def main(page: ft.Page):
         if delete_running['value']:
             return
         set_delete_running(True)
+        control = JobControl()
+        register_control(control)
         def wrapped():
             try:
                 run_playwright_task(
@@ -839,9 +2907,11 @@ def main(page: ft.Page):
                     delete_start_date.value,
                     delete_end_date.value,
                     class_names_input.value,
-                    (org_mode.value == "organizer")
+                    (org_mode.value == "organizer"),
+                    control=control
                 )
             finally:
+                unregister_control(control)
                 set_delete_running(False)
         run_in_thread(wrapped)
     delete_by_name_button.on_click = handle_delete_schedules
@@ -850,6 +2920,8 @@ def main(page: ft.Page):
         if delete_running['value']:
             return
         set_delete_running(True)
+        control = JobControl()
+        register_control(control)
         def wrapped():
             try:
                 run_playwright_task(
@@ -858,9 +2930,11 @@ def main(page: ft.Page):
                     delete_custom_schedules_logic,
                     delete_custom_schedules_input.value,
                     class_names_input.value,
-                    (org_mode.value == "organizer")
+                    (org_mode.value == "organizer"),
+                    control=control
                 )
             finally:
+                unregister_control(control)
                 set_delete_running(False)
         run_in_thread(wrapped)
     delete_custom_button.on_click = handle_delete_custom_schedules
@@ -889,6 +2963,105 @@ def main(page: ft.Page):
     delete_mode.on_change = update_delete_form
     update_delete_form()
 
+    # --- 日程の一括編集用UI ---
+    edit_class_names_input = ft.TextField(
+        label="対象の講座名 (日付と開始時刻で指定する場合。複数ある場合は改行して入力)",
+        multiline=True,
+        min_lines=2,
+        width=600,
+        hint_text="例:\nNotebookLMに資料投入！",
+        hint_style=ft.TextStyle(color="#bbbbbb")
+    )
+    edit_schedules_input = ft.TextField(
+        label="編集内容 (対象\t定員\t受講料\t締切\t連絡先 / 変更しない項目は空欄)",
+        multiline=True,
+        min_lines=3,
+        width=600,
+        hint_text="対象\t定員\t受講料\t締め切り日時\t緊急連絡先\n2025-08-27 14:00\t5\t3000\t1日前\t\n1234567\t\t2000\t\t",
+        hint_style=ft.TextStyle(color="#bbbbbb")
+    )
+    edit_button = ft.ElevatedButton("一括編集", bgcolor="purple", color="white")
+
+    # 排他制御用フラグ
+    edit_running = {'value': False}
+
+    def set_edit_running(state: bool):
+        edit_running['value'] = state
+        edit_button.disabled = state
+        page.update()
+
+    def handle_edit_schedules(e):
+        if edit_running['value']:
+            return
+        set_edit_running(True)
+        control = JobControl()
+        register_control(control)
+        def wrapped():
+            try:
+                run_playwright_task(
+                    page,
+                    log_column,
+                    edit_schedules_logic,
+                    edit_schedules_input.value,
+                    edit_class_names_input.value,
+                    (org_mode.value == "organizer"),
+                    control=control
+                )
+            finally:
+                unregister_control(control)
+                set_edit_running(False)
+        run_in_thread(wrapped)
+    edit_button.on_click = handle_edit_schedules
+
+    # --- 日程の複製用UI ---
+    clone_class_names_input = ft.TextField(
+        label="複製する講座名 (空欄の場合は期間内のすべての講座。複数ある場合は改行して入力)",
+        multiline=True,
+        min_lines=2,
+        width=600,
+        hint_text="例:\nGASシステム開発入門！",
+        hint_style=ft.TextStyle(color="#bbbbbb")
+    )
+    clone_source_start = ft.TextField(label="複製元の開始日 (YYYY-MM-DD)", width=200)
+    clone_source_end = ft.TextField(label="複製元の終了日 (YYYY-MM-DD)", width=200)
+    clone_shift_weeks = ft.TextField(label="何週間後に複製するか", value="1", width=200)
+    clone_target_start = ft.TextField(label="または複製先の開始日 (YYYY-MM-DD)", width=250)
+    clone_button = ft.ElevatedButton("日程を複製", bgcolor="teal", color="white")
+
+    # 排他制御用フラグ
+    clone_running = {'value': False}
+
+    def set_clone_running(state: bool):
+        clone_running['value'] = state
+        clone_button.disabled = state
+        page.update()
+
+    def handle_clone_schedules(e):
+        if clone_running['value']:
+            return
+        set_clone_running(True)
+        control = JobControl()
+        register_control(control)
+        def wrapped():
+            try:
+                run_playwright_task(
+                    page,
+                    log_column,
+                    clone_schedules_logic,
+                    clone_class_names_input.value,
+                    clone_source_start.value,
+                    clone_source_end.value,
+                    clone_shift_weeks.value,
+                    clone_target_start.value,
+                    (org_mode.value == "organizer"),
+                    control=control
+                )
+            finally:
+                unregister_control(control)
+                set_clone_running(False)
+        run_in_thread(wrapped)
+    clone_button.on_click = handle_clone_schedules
+
     # ログ表示用UI
     log_column = ft.Column([], scroll=ft.ScrollMode.ADAPTIVE, expand=True, auto_scroll=True)
     log_container = ft.Container(
@@ -913,10 +3086,30 @@ def main(page: ft.Page):
             delete_mode,
             delete_form_container,
             ft.Divider(),
-            ft.Text("実行ログ", size=16),
+            ft.Text("日程の一括編集", size=20, weight=ft.FontWeight.BOLD),
+            edit_class_names_input,
+            edit_schedules_input,
+            edit_button,
+            ft.Divider(),
+            ft.Text("日程の複製", size=20, weight=ft.FontWeight.BOLD),
+            clone_class_names_input,
+            ft.Row([clone_source_start, clone_source_end]),
+            ft.Row([clone_shift_weeks, clone_target_start]),
+            clone_button,
+            ft.Divider(),
+            ft.Row([ft.Text("実行ログ", size=16), pause_button, stop_button]),
             log_container
         ], expand=True, scroll=ft.ScrollMode.ADAPTIVE)
     )
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    parser = argparse.ArgumentParser(description="ストアカ日程自動化ツール")
+    parser.add_argument("--serve", action="store_true", help="画面を表示せずにローカルHTTP APIとして起動する")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    parser.add_argument("--token", default=os.environ.get("SERVICE_TOKEN"), help="APIのトークン（省略時は起動ごとに発行）")
+    args = parser.parse_args()
+    if args.serve:
+        run_service(port=args.port, workers=args.workers, token=args.token)
+    else:
+        ft.app(target=main)